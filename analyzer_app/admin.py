@@ -1,3 +1,27 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Analysis, MonitoredSite, ScoreHistogram
+
+
+@admin.register(Analysis)
+class AnalysisAdmin(admin.ModelAdmin):
+    list_display = ('url', 'host', 'created_at')
+    list_filter = ('host',)
+    search_fields = ('url',)
+    readonly_fields = ('created_at',)
+
+
+@admin.register(ScoreHistogram)
+class ScoreHistogramAdmin(admin.ModelAdmin):
+    list_display = ('topic', 'category', 'total', 'updated_at')
+    list_filter = ('topic', 'category')
+    readonly_fields = ('counts', 'total', 'updated_at')
+
+
+@admin.register(MonitoredSite)
+class MonitoredSiteAdmin(admin.ModelAdmin):
+    list_display = ('url', 'active', 'interval_hours', 'last_checked_at', 'last_changed_at', 'next_check_at')
+    list_filter = ('active', 'host')
+    search_fields = ('url',)
+    readonly_fields = ('url_hash', 'etag', 'last_modified', 'content_hash', 'last_checked_at', 'last_changed_at',
+                       'created_at')
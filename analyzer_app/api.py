@@ -0,0 +1,261 @@
+"""
+Versioned JSON API for analyses (/api/v1/).
+
+Every response carries a strong ETag derived from the stored content hash,
+so polling clients can send If-None-Match and get an empty 304 back without
+the server loading or serializing the payload.
+
+Results are trimmed to the caller's tier exactly like the HTML views
+(views.result_for_tier): premium categories and AI fixes need a premium
+session. Free and premium representations have different ETags.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition, require_http_methods
+
+from .export import FORMATS, ROWS, export_lines
+from .models import Analysis
+from .store import result_hash
+from .throttle import RateLimited, analyze_url, check_client_rate
+from .views import result_for_tier
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+API_VERSION = 'v1'
+HISTORY_DEFAULT_LIMIT = 20
+HISTORY_MAX_LIMIT = 200
+# Responses smaller than this aren't worth compressing
+MIN_COMPRESS_LENGTH = 200
+
+ENCODING_SUFFIXES = {'br': '-br', 'gzip': '-gz'}
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    The content coding to answer an Accept-Encoding header with: the one we
+    support with the highest q-value (brotli wins ties), or None when the
+    client accepts neither. "*" covers codings not listed; q=0 refuses one.
+    """
+    qvalues = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        qvalue = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[coding] = qvalue
+
+    best, best_qvalue = None, 0.0
+    for coding in (['br'] if brotli is not None else []) + ['gzip']:
+        qvalue = qvalues.get(coding, qvalues.get('*', 0.0))
+        if qvalue > best_qvalue:
+            best, best_qvalue = coding, qvalue
+    return best
+
+
+def compressed(view):
+    """
+    Compresses the response with brotli or gzip, whichever the client accepts.
+
+    Unlike django.middleware.gzip this keeps the ETag strong by giving each
+    encoding its own tag ("<hash>-gz"). Incoming If-None-Match tags are only
+    unsuffixed for the encoding negotiated for this request, so a client
+    holding another representation never gets a 304 for this one.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+        suffix = ENCODING_SUFFIXES[encoding] if encoding else None
+        held_encoded = suffix is not None and f'{suffix}"' in if_none_match
+        if held_encoded:
+            request.META['HTTP_IF_NONE_MATCH'] = if_none_match.replace(f'{suffix}"', '"')
+
+        response = view(request, *args, **kwargs)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if encoding is None:
+            return response
+
+        if response.status_code == 304:
+            # A 304 describes the representation the client already holds
+            if response.has_header('ETag') and held_encoded:
+                response['ETag'] = response['ETag'][:-1] + suffix + '"'
+            return response
+        if response.streaming or len(response.content) < MIN_COMPRESS_LENGTH or response.has_header('Content-Encoding'):
+            return response
+
+        if encoding == 'br':
+            body = brotli.compress(response.content)
+        else:
+            body = compress_string(response.content)
+        if len(body) >= len(response.content):
+            return response
+
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        if response.has_header('ETag'):
+            response['ETag'] = response['ETag'][:-1] + suffix + '"'
+        return response
+
+    return wrapper
+
+
+def _is_premium(request):
+    return request.session.get('is_premium', False)
+
+
+def _tier_etag(content_hash, is_premium):
+    """
+    ETag of the representation a tier is served. The free one is a fixed
+    trimming of the stored result, so it is identified by the same hash
+    under its own namespace.
+    """
+    if is_premium:
+        return content_hash
+    return hashlib.sha256(f'free:{content_hash}'.encode('ascii')).hexdigest()
+
+
+def _serialize(analysis, is_premium):
+    return {
+        'id': analysis.pk,
+        'url': analysis.url,
+        'host': analysis.host,
+        'created_at': analysis.created_at.isoformat(),
+        'result': result_for_tier(analysis.result, is_premium),
+    }
+
+
+def _error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _analysis_etag(request, analysis_id):
+    content_hash = Analysis.objects.filter(pk=analysis_id).values_list('result_hash', flat=True).first()
+    return _tier_etag(content_hash, _is_premium(request)) if content_hash else None
+
+
+def _history_limit(request):
+    try:
+        limit = int(request.GET.get('limit', HISTORY_DEFAULT_LIMIT))
+    except ValueError:
+        limit = HISTORY_DEFAULT_LIMIT
+    return max(1, min(limit, HISTORY_MAX_LIMIT))
+
+
+def _history_etag(request, host):
+    hashes = Analysis.objects.filter(host=host.lower()).values_list('pk', 'result_hash')[:_history_limit(request)]
+    digest = hashlib.sha256(b'premium;' if _is_premium(request) else b'free;')
+    for pk, content_hash in hashes:
+        digest.update(f'{pk}:{content_hash};'.encode('ascii'))
+    return digest.hexdigest()
+
+
+@csrf_exempt
+@compressed
+@require_http_methods(['POST'])
+def submit_analysis(request):
+    """
+    POST {"url": "..."} (JSON or form-encoded) -> 201 with the new analysis.
+    """
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return _error('Request body is not valid JSON.', 400)
+        url = payload.get('url') if isinstance(payload, dict) else None
+    else:
+        url = request.POST.get('url')
+    if not url:
+        return _error('Please provide a URL.', 400)
+
+    try:
+        check_client_rate(request)
+        analysis_id, _ = analyze_url(url)
+    except RateLimited as e:
+        response = _error(str(e), 429)
+        response['Retry-After'] = str(e.retry_after)
+        return response
+    except ValueError as e:
+        return _error(str(e), 502)
+
+    analysis = Analysis.objects.get(pk=analysis_id)
+    is_premium = _is_premium(request)
+    response = JsonResponse(_serialize(analysis, is_premium), status=201)
+    response['Location'] = f'/api/{API_VERSION}/analyses/{analysis_id}/'
+    response['ETag'] = f'"{_tier_etag(analysis.result_hash, is_premium)}"'
+    return response
+
+
+@compressed
+@require_http_methods(['GET', 'HEAD'])
+@condition(etag_func=_analysis_etag)
+def analysis_detail(request, analysis_id):
+    """
+    GET a stored analysis by id.
+    """
+    analysis = Analysis.objects.filter(pk=analysis_id).first()
+    if analysis is None:
+        return _error('Analysis not found.', 404)
+    if not analysis.result_hash:
+        # Rows saved before hashes were stored
+        analysis.result_hash = result_hash(analysis.result)
+        analysis.save(update_fields=['result_hash'])
+    is_premium = _is_premium(request)
+    response = JsonResponse(_serialize(analysis, is_premium))
+    response['ETag'] = f'"{_tier_etag(analysis.result_hash, is_premium)}"'
+    return response
+
+
+@compressed
+@require_http_methods(['GET', 'HEAD'])
+@condition(etag_func=_history_etag)
+def site_history(request, host):
+    """
+    GET the most recent analyses of a site, newest first (?limit=, max 200).
+    """
+    analyses = Analysis.objects.filter(host=host.lower())[:_history_limit(request)]
+    return JsonResponse({
+        'host': host.lower(),
+        'analyses': [_serialize(analysis, _is_premium(request)) for analysis in analyses],
+    })
+
+
+@require_http_methods(['GET'])
+def site_export(request, host):
+    """
+    GET every analysis of a site as a streamed download, oldest first.
+    ?format=csv|jsonl, ?rows=analyses|recommendations, ?flatten=1 for
+    one column per category score and metric. Trimmed to the caller's tier.
+    """
+    fmt = request.GET.get('format', 'csv')
+    rows = request.GET.get('rows', 'analyses')
+    if fmt not in FORMATS:
+        return _error(f"Unknown format; use one of: {', '.join(FORMATS)}.", 400)
+    if rows not in ROWS:
+        return _error(f"Unknown rows; use one of: {', '.join(ROWS)}.", 400)
+    flatten = request.GET.get('flatten') in ('1', 'true', 'yes')
+
+    host = host.lower()
+    analyses = Analysis.objects.filter(host=host)
+    lines = export_lines(analyses, fmt=fmt, rows=rows, flatten=flatten, is_premium=_is_premium(request))
+    response = StreamingHttpResponse(lines, content_type=FORMATS[fmt])
+    filename = f"{host.replace(':', '_')}-{rows}.{fmt}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
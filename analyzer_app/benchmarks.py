@@ -0,0 +1,149 @@
+"""
+Topic benchmarks: where an analysis ranks among every site analyzed for
+its topic.
+
+Scores are integers from 0 to 100, so each (topic, category) distribution
+is kept as an exact 101-bin histogram (ScoreHistogram). Saving an analysis
+bumps one bin per category, and a percentile rank is a sum over at most 101
+bins, however many analyses have been stored. New histograms are seeded
+with the topic's reference site from benchmarks.json.
+"""
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import transaction
+
+from .models import Analysis, ScoreHistogram
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS_PATH = os.path.join(BASE_DIR, 'benchmarks.json')
+
+MAX_SCORE = 100
+CATEGORIES = ('overall', 'discoverability', 'content', 'visual', 'ux', 'engagement', 'topic_fit')
+
+
+@lru_cache(maxsize=1)
+def reference_sites() -> Dict[str, Dict[str, Any]]:
+    """
+    The static per-topic reference sites in benchmarks.json.
+    """
+    try:
+        with open(BENCHMARKS_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def category_scores(data: Dict[str, Any]) -> Dict[str, int]:
+    """
+    The benchmarked scores of an analyze_page() result, clamped to 0-100.
+    """
+    scores = {'overall': data.get('overall_score')}
+    for name, category in data.get('categories', {}).items():
+        scores[name] = category.get('score')
+    return {
+        name: max(0, min(MAX_SCORE, int(score)))
+        for name, score in scores.items()
+        if name in CATEGORIES and isinstance(score, (int, float))
+    }
+
+
+def percentile_rank(counts: List[int], score: int) -> Optional[int]:
+    """
+    Share of the histogram below score, counting ties as half, as 0-100.
+    """
+    total = sum(counts)
+    if not total:
+        return None
+    below = sum(counts[:score])
+    return round(100 * (below + counts[score] / 2) / total)
+
+
+def _new_histogram(topic: str, category: str) -> ScoreHistogram:
+    counts = [0] * (MAX_SCORE + 1)
+    reference = reference_sites().get(topic, {}).get('scores', {}).get(category)
+    if isinstance(reference, (int, float)):
+        counts[max(0, min(MAX_SCORE, int(reference)))] = 1
+    return ScoreHistogram(topic=topic, category=category, counts=counts, total=sum(counts))
+
+
+def _locked_histograms(topic: str, categories: List[str]) -> Dict[str, ScoreHistogram]:
+    """
+    The topic's histograms for categories, created (seeded) where missing and
+    locked for update until the surrounding transaction ends.
+    """
+    existing = set(
+        ScoreHistogram.objects.filter(topic=topic, category__in=categories).values_list('category', flat=True)
+    )
+    for category in categories:
+        if category not in existing:
+            seed = _new_histogram(topic, category)
+            # get_or_create tolerates a concurrent request creating the same row
+            ScoreHistogram.objects.get_or_create(
+                topic=topic, category=category, defaults={'counts': seed.counts, 'total': seed.total},
+            )
+    queryset = ScoreHistogram.objects.select_for_update().filter(topic=topic, category__in=categories)
+    return {histogram.category: histogram for histogram in queryset}
+
+
+def record_scores(topic: str, scores: Dict[str, int]) -> Tuple[Dict[str, Optional[int]], int]:
+    """
+    Ranks scores against the topic's histograms, then adds them to those
+    histograms. Returns the percentile ranks (None where there is nothing
+    to rank against) and how many scores they were ranked against.
+    """
+    with transaction.atomic():
+        histograms = _locked_histograms(topic, list(scores))
+        ranks = {}
+        sample_size = 0
+        for category, score in scores.items():
+            histogram = histograms[category]
+            ranks[category] = percentile_rank(histogram.counts, score)
+            sample_size = max(sample_size, histogram.total)
+            histogram.counts[score] += 1
+            histogram.total += 1
+            histogram.save()
+    return ranks, sample_size
+
+
+def benchmark(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Records a new analysis result in its topic's histograms and returns the
+    comparison block stored with it under "benchmark".
+    """
+    topic = data.get('topic') or 'Other'
+    ranks, sample_size = record_scores(topic, category_scores(data))
+    reference = reference_sites().get(topic)
+    return {
+        'topic': topic,
+        'percentiles': ranks,
+        'sample_size': sample_size,
+        'reference': {'url': reference.get('url'), 'scores': reference.get('scores', {})} if reference else None,
+    }
+
+
+def rebuild_histograms() -> int:
+    """
+    Recomputes every histogram from the stored analyses (plus the reference
+    sites). Returns the number of analyses counted.
+    """
+    histograms: Dict[tuple, ScoreHistogram] = {}
+    counted = 0
+    for data in Analysis.objects.values_list('result', flat=True).iterator():
+        if not isinstance(data, dict):
+            continue
+        topic = data.get('topic') or 'Other'
+        for category, score in category_scores(data).items():
+            key = (topic, category)
+            if key not in histograms:
+                histograms[key] = _new_histogram(topic, category)
+            histograms[key].counts[score] += 1
+            histograms[key].total += 1
+        counted += 1
+
+    with transaction.atomic():
+        ScoreHistogram.objects.all().delete()
+        ScoreHistogram.objects.bulk_create(histograms.values())
+    return counted
@@ -0,0 +1,148 @@
+"""
+Main-content extraction.
+
+Finds the article body of a blog page with text-density and link-density
+heuristics (in the spirit of Readability), so navigation, footers, cookie
+banners and comment widgets never reach the NLP stages. The soup is not
+modified: SEO and visual checks still see the whole page.
+"""
+import re
+from typing import List, Set
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+# Elements that are never part of an article body
+BOILERPLATE_TAGS = ['nav', 'footer', 'header', 'aside', 'form', 'noscript', 'iframe', 'button', 'select']
+# Matched against whole class/id tokens ("site-footer", "comments", "share-buttons"),
+# never substrings, so layout wrappers like "content-sidebar-wrap" survive
+BOILERPLATE_TOKEN_RE = re.compile(
+    r'(?:[a-z0-9]+[-_])?'
+    r'(?:comments?|cookies?|consent|banner|newsletter|subscribe|signup|share|sharing|social|sidebar|'
+    r'widgets?|related|footer|header|menu|navbar|breadcrumbs?|popup|modal|promo|sponsored|sponsor|'
+    r'advert|ads?|disqus)'
+    r'(?:[-_](?:area|bar|box|buttons|container|icons|inner|links|list|nav|notice|posts|section|slot|unit))?',
+    re.I,
+)
+CONTENT_HINT_RE = re.compile(r'article|content|entry|post|story|main|body|text', re.I)
+PARAGRAPH_TAGS = ['p', 'pre', 'blockquote', 'li', 'td', 'h2', 'h3']
+BLOCK_TAGS = {
+    'p', 'div', 'br', 'li', 'ul', 'ol', 'tr', 'td', 'pre', 'blockquote', 'section', 'article',
+    'main', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'figure', 'figcaption', 'table',
+}
+
+MIN_PARAGRAPH_CHARS = 25
+MAX_CANDIDATES = 10
+# Below this much extracted text we don't trust the heuristics and fall back
+MIN_CONTENT_CHARS = 250
+
+
+def _attributes(tag: Tag) -> str:
+    return " ".join(tag.get('class') or []) + " " + (tag.get('id') or '')
+
+
+def _flagged(tag: Tag) -> bool:
+    return any(BOILERPLATE_TOKEN_RE.fullmatch(token) for token in _attributes(tag).split())
+
+
+def _boilerplate_elements(soup: BeautifulSoup) -> Set[int]:
+    found = set()
+    for tag in soup.find_all(True):
+        if tag.name in BOILERPLATE_TAGS:
+            found.add(id(tag))
+        elif tag.name not in ('html', 'body', 'article', 'main') and _flagged(tag):
+            found.add(id(tag))
+    # A flagged element that wraps the article or main element is layout, not boilerplate
+    for tag in soup.find_all(['article', 'main']):
+        found.difference_update(id(parent) for parent in tag.parents)
+    return found
+
+
+def _inside(tag: Tag, elements: Set[int]) -> bool:
+    return id(tag) in elements or any(id(parent) in elements for parent in tag.parents)
+
+
+def _text(node: Tag, skipped: Set[int]) -> str:
+    """
+    Like get_text(), but leaves out boilerplate subtrees.
+    """
+    parts = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, NavigableString):
+            if type(current) is NavigableString:  # skips comments, CDATA, doctype
+                parts.append(str(current))
+            continue
+        if id(current) in skipped or current.name in ('script', 'style'):
+            continue
+        if current.name in BLOCK_TAGS:
+            # Keep block boundaries so "Title</h1><p>Body" doesn't fuse into one word
+            parts.append("\n")
+        stack.extend(reversed(current.contents))
+    return "".join(parts)
+
+
+def _link_density(node: Tag, text_length: int) -> float:
+    if not text_length:
+        return 1.0
+    link_length = sum(len(a.get_text(strip=True)) for a in node.find_all('a'))
+    return min(1.0, link_length / text_length)
+
+
+def extract_main_content(soup: BeautifulSoup) -> str:
+    """
+    Returns the text of the page's main content block.
+    """
+    root = soup.body or soup
+    skipped = _boilerplate_elements(soup)
+
+    # Score paragraphs and credit their parent (fully) and grandparent (half)
+    scores = {}
+    nodes = {}
+    for paragraph in root.find_all(PARAGRAPH_TAGS):
+        if _inside(paragraph, skipped):
+            continue
+        text = paragraph.get_text(" ", strip=True)
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        score = 1 + text.count(',') + min(len(text) / 100, 3)
+        for ancestor, share in ((paragraph.parent, 1.0), (paragraph.parent and paragraph.parent.parent, 0.5)):
+            if ancestor is None or not isinstance(ancestor, Tag):
+                continue
+            if id(ancestor) not in nodes:
+                nodes[id(ancestor)] = ancestor
+                bonus = 5 if ancestor.name in ('article', 'main') or CONTENT_HINT_RE.search(_attributes(ancestor)) else 0
+                scores[id(ancestor)] = bonus
+            scores[id(ancestor)] += score * share
+
+    if not scores:
+        return _text(root, set())
+
+    # Penalize link-heavy candidates (menus, tag clouds, "related posts");
+    # only the front-runners are worth the extra subtree walk
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    for key in ranked[:MAX_CANDIDATES]:
+        node = nodes[key]
+        text_length = len(_text(node, skipped).strip())
+        scores[key] *= 1 - _link_density(node, text_length)
+    for key in ranked[MAX_CANDIDATES:]:
+        scores[key] = 0
+
+    best_key = max(scores, key=scores.get)
+    best = nodes[best_key]
+    # Nothing wrapping the winner can be boilerplate
+    skipped = skipped - {id(ancestor) for ancestor in best.parents}
+    threshold = max(10.0, scores[best_key] * 0.2)
+
+    # Siblings that score well are usually split-up parts of the same article
+    selected: List[Tag] = []
+    parent = best.parent if isinstance(best.parent, Tag) else None
+    for sibling in (parent.children if parent else [best]):
+        if sibling is best or (isinstance(sibling, Tag) and scores.get(id(sibling), 0) >= threshold):
+            selected.append(sibling)
+
+    content = "\n".join(_text(node, skipped) for node in selected)
+    if len(content.strip()) < MIN_CONTENT_CHARS:
+        # The heuristics found too little; the whole page beats an empty text
+        return _text(root, set())
+    return content
@@ -0,0 +1,349 @@
+"""
+Site crawler for whole-blog audits.
+
+Discovers posts from robots.txt sitemaps, sitemap.xml, RSS/Atom feeds and
+internal links, fetches them politely (robots.txt rules, Crawl-delay and a
+token bucket per host) and hands each new page to a callback, by default the
+regular analyze_page() + save_analysis() pipeline.
+"""
+import gzip
+import logging
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+from bs4 import BeautifulSoup
+
+from .fingerprint import SimHashIndex, content_hash, simhash
+from .logic import BROWSER_HEADERS, ParsedPage, normalize_url, parse_page
+
+# Token used when evaluating robots.txt rules
+ROBOTS_USER_AGENT = 'BoostyBot'
+DEFAULT_RATE = 1.0  # requests per second per host when robots.txt sets no Crawl-delay
+DEFAULT_BURST = 2
+MAX_SITEMAPS = 50
+FEED_PATHS = ('/feed', '/rss.xml', '/atom.xml', '/feed.xml', '/index.xml')
+SITEMAP_PATH = '/sitemap.xml'
+FEED_TYPES = ('application/rss+xml', 'application/atom+xml')
+# Links to these are never blog posts
+SKIPPED_EXTENSIONS = (
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.pdf', '.zip',
+    '.mp3', '.mp4', '.css', '.js', '.xml', '.json',
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CrawledPage(NamedTuple):
+    url: str
+    html: str
+    content_hash: str
+    simhash: int
+    parsed: ParsedPage
+
+    @property
+    def text(self) -> str:
+        return self.parsed.text
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: float = DEFAULT_BURST):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def _local_name(tag: str) -> str:
+    # Sitemap and feed elements come namespaced: {http://...}loc
+    return tag.rsplit('}', 1)[-1].lower()
+
+
+def parse_sitemap(body: bytes) -> Dict[str, List[str]]:
+    """
+    Returns {"sitemaps": [...], "pages": [...]} from a sitemap index or urlset.
+    """
+    if body[:2] == b'\x1f\x8b':
+        body = gzip.decompress(body)
+    result = {"sitemaps": [], "pages": []}
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        return result
+    bucket = "sitemaps" if _local_name(root.tag) == 'sitemapindex' else "pages"
+    for element in root.iter():
+        if _local_name(element.tag) == 'loc' and element.text:
+            result[bucket].append(element.text.strip())
+    return result
+
+
+def parse_feed(body: bytes) -> List[str]:
+    """
+    Returns the post links of an RSS 2.0 or Atom feed.
+    """
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        return []
+    links = []
+    for entry in root.iter():
+        if _local_name(entry.tag) not in ('item', 'entry'):
+            continue
+        for child in entry:
+            if _local_name(child.tag) != 'link':
+                continue
+            href = child.get('href') or (child.text or '').strip()
+            if href and child.get('rel', 'alternate') == 'alternate':
+                links.append(href)
+                break
+    return links
+
+
+class Crawler:
+    """
+    Crawls one site. Pages are fetched by a small thread pool, but every
+    request first takes a token from its host's bucket, so concurrency never
+    exceeds what robots.txt Crawl-delay (or DEFAULT_RATE) allows.
+    """
+
+    def __init__(self, root_url: str, max_pages: int = 100, rate: float = DEFAULT_RATE,
+                 workers: int = 4, follow_links: bool = True, max_depth: int = 2, timeout: int = 15):
+        self.root_url = normalize_url(root_url)
+        self.host = urlsplit(self.root_url).netloc
+        self.max_pages = max_pages
+        self.rate = rate
+        self.workers = workers
+        self.follow_links = follow_links
+        self.max_depth = max_depth
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update(BROWSER_HEADERS)
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.robots: Dict[str, RobotFileParser] = {}
+        self.lock = threading.Lock()
+        self.seen_urls: Set[str] = set()
+        self.seen_hashes: Set[str] = set()
+        self.near_duplicates = SimHashIndex()
+
+    # --- Politeness ---
+
+    def _robots(self, url: str) -> RobotFileParser:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self.lock:
+            parser = self.robots.get(origin)
+        if parser is not None:
+            return parser
+
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            response = self.session.get(parser.url, timeout=self.timeout)
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif response.ok:
+                parser.parse(response.text.splitlines())
+            else:
+                parser.allow_all = True
+        except requests.RequestException:
+            parser.allow_all = True
+
+        with self.lock:
+            self.robots[origin] = parser
+            delay = parser.crawl_delay(ROBOTS_USER_AGENT)
+            rate = min(self.rate, 1.0 / float(delay)) if delay else self.rate
+            self.buckets[parts.netloc] = TokenBucket(rate, capacity=1 if delay else DEFAULT_BURST)
+        return parser
+
+    def allowed(self, url: str) -> bool:
+        return self._robots(url).can_fetch(ROBOTS_USER_AGENT, url)
+
+    def fetch(self, url: str, guessed: bool = False) -> Optional[requests.Response]:
+        """
+        Fetches url after robots.txt and rate-limit checks; None if skipped or
+        failed. guessed URLs (feed and sitemap locations tried blindly) are
+        often missing, so their failures are only logged at debug level.
+        """
+        if not self.allowed(url):
+            return None
+        self.buckets[urlsplit(url).netloc].acquire()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return response
+        except requests.RequestException as e:
+            logger.log(logging.DEBUG if guessed else logging.WARNING, "Error fetching %s: %s", url, e)
+            return None
+
+    # --- Discovery ---
+
+    def _same_site(self, url: str) -> bool:
+        return urlsplit(url).netloc == self.host and not urlsplit(url).path.lower().endswith(SKIPPED_EXTENSIONS)
+
+    def discover_sitemap_pages(self) -> List[str]:
+        declared = self._robots(self.root_url).site_maps()
+        fallback = None if declared else urljoin(self.root_url, SITEMAP_PATH)
+        sitemaps = deque(declared or [fallback])
+        visited = set()
+        pages = []
+        while sitemaps and len(visited) < MAX_SITEMAPS and len(pages) < self.max_pages * 2:
+            sitemap_url = sitemaps.popleft()
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+            response = self.fetch(sitemap_url, guessed=sitemap_url == fallback)
+            if response is None:
+                continue
+            parsed = parse_sitemap(response.content)
+            sitemaps.extend(parsed["sitemaps"])
+            pages.extend(parsed["pages"])
+        return pages
+
+    def discover_feed_pages(self, homepage_html: str) -> List[str]:
+        soup = BeautifulSoup(homepage_html, 'html.parser')
+        declared = [
+            urljoin(self.root_url, link['href'])
+            for link in soup.find_all('link', href=True)
+            if (link.get('type') or '').lower() in FEED_TYPES
+        ]
+        pages = []
+        for feed_url in declared or [urljoin(self.root_url, path) for path in FEED_PATHS]:
+            response = self.fetch(feed_url, guessed=not declared)
+            if response is not None:
+                pages.extend(parse_feed(response.content))
+            if pages and not declared:
+                # Guessed locations usually alias the same feed
+                break
+        return pages
+
+    @staticmethod
+    def extract_links(base_url: str, html: str) -> List[str]:
+        soup = BeautifulSoup(html, 'html.parser')
+        return [urljoin(base_url, a['href']) for a in soup.find_all('a', href=True)]
+
+    # --- Crawl ---
+
+    def _claim_url(self, url: str) -> Optional[str]:
+        normalized = normalize_url(url)
+        if not normalized.startswith(('http://', 'https://')) or not self._same_site(normalized):
+            return None
+        with self.lock:
+            if normalized in self.seen_urls:
+                return None
+            self.seen_urls.add(normalized)
+        return normalized
+
+    def _claim_all(self, urls: Iterable[str]) -> List[str]:
+        return [claimed for claimed in map(self._claim_url, urls) if claimed]
+
+    def _claim_content(self, url: str, html: str) -> Optional[CrawledPage]:
+        """
+        Returns the page unless its text exactly or nearly matches one already crawled.
+        """
+        parsed = parse_page(html)
+        digest = content_hash(parsed.text)
+        fingerprint = simhash(parsed.text)
+        with self.lock:
+            if digest in self.seen_hashes or self.near_duplicates.find(fingerprint) is not None:
+                return None
+            self.seen_hashes.add(digest)
+            self.near_duplicates.add(url, fingerprint)
+        return CrawledPage(url, html, digest, fingerprint, parsed)
+
+    def _fetch_batch(self, urls: Iterable[str], pool: ThreadPoolExecutor):
+        for url, response in zip(urls, pool.map(self.fetch, urls)):
+            if response is not None and 'html' in response.headers.get('Content-Type', 'text/html'):
+                yield url, response.text
+
+    def crawl(self) -> Iterator[CrawledPage]:
+        """
+        Yields each distinct page of the site, up to max_pages.
+        """
+        homepage = self.fetch(self.root_url)
+        homepage_html = homepage.text if homepage is not None else ''
+        self.seen_urls.add(self.root_url)
+
+        frontier = self._claim_all(self.discover_sitemap_pages())
+        if homepage_html:
+            frontier += self._claim_all(self.discover_feed_pages(homepage_html))
+
+        yielded = 0
+        if homepage_html:
+            page = self._claim_content(self.root_url, homepage_html)
+            if page:
+                yield page
+                yielded += 1
+        depth = 0
+        link_sources = [(self.root_url, homepage_html)] if homepage_html else []
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while yielded < self.max_pages:
+                if not frontier and self.follow_links and depth < self.max_depth and link_sources:
+                    # Sitemaps and feeds exhausted: fall back to internal links
+                    depth += 1
+                    frontier = self._claim_all(
+                        url for base, html in link_sources for url in self.extract_links(base, html)
+                    )
+                    link_sources = []
+                if not frontier:
+                    break
+
+                batch, frontier = frontier[:self.workers * 2], frontier[self.workers * 2:]
+                for url, html in self._fetch_batch(batch, pool):
+                    if self.follow_links:
+                        link_sources.append((url, html))
+                    page = self._claim_content(url, html)
+                    if page is None:
+                        continue
+                    yield page
+                    yielded += 1
+                    if yielded >= self.max_pages:
+                        break
+
+
+def analyze_and_store(page: CrawledPage) -> Tuple[int, Dict[str, Any]]:
+    """
+    Runs a crawled page through analyze_page() and stores the result.
+    """
+    from .store import analyze_and_save
+
+    # A crawl is a batch job, so long pages may use the noun phrase process pool
+    return analyze_and_save(page.url, page.html, fingerprint=page.simhash, parsed=page.parsed, parallel=True)
+
+
+def audit_site(root_url: str, on_page: Optional[Callable[[CrawledPage], Any]] = None, **options) -> int:
+    """
+    Crawls a site and runs every page through the analysis pipeline.
+    Returns the number of pages processed.
+    """
+    if on_page is None:
+        on_page = analyze_and_store
+
+    processed = 0
+    for page in Crawler(root_url, **options).crawl():
+        on_page(page)
+        processed += 1
+    return processed
@@ -0,0 +1,155 @@
+"""
+Streaming exports of stored analyses as CSV or JSON Lines.
+
+Rows are read from the database cursor in chunks (QuerySet.iterator) and
+serialized one at a time by generators, so exporting a site audit of
+thousands of pages takes constant memory and starts sending immediately.
+
+Two row shapes are available:
+    analyses         one row per analysis; with flatten, every category
+                     score and metric becomes its own column
+    recommendations  one row per recommendation of every analysis
+
+Free callers get each result as their tier sees it (views.result_for_tier):
+premium categories are empty and later recommendations have no AI fix.
+"""
+import csv
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List
+
+from .views import result_for_tier
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+ROWS = ('analyses', 'recommendations')
+CHUNK_SIZE = 500
+
+ANALYSIS_FIELDS = ['id', 'url', 'host', 'created_at', 'overall_score', 'topic', 'author']
+RECOMMENDATION_FIELDS = ['analysis_id', 'url', 'priority', 'title', 'desc', 'ai_fix']
+# The categories and metrics analyze_page reports, in report order
+CATEGORY_METRICS = {
+    'discoverability': ['Keywords', 'Meta Descriptions', 'Headings'],
+    'content': ['Readability', 'Grammar', 'Structure'],
+    'visual': ['Layout', 'Color Scheme', 'Mobile Response'],
+    'ux': ['Navigation', 'Layout Flow', 'Mobile Usability'],
+    'engagement': ['CTAs', 'Shareability', 'Stickiness'],
+    'topic_fit': ['Clarity', 'Depth', 'Practicality'],
+}
+
+
+class Echo:
+    """
+    File-like object for csv.writer that hands each row back instead of storing it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _slug(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+def flatten_categories(categories: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    {"content": {"score": 80, "metrics": [{"name": "Grammar", "value": 90}]}}
+    -> {"content_score": 80, "content_grammar": 90}
+    """
+    flat = {}
+    for name, category in categories.items():
+        flat[f'{name}_score'] = category.get('score')
+        for metric in category.get('metrics', []):
+            flat[f'{name}_{_slug(metric.get("name", ""))}'] = metric.get('value')
+    return flat
+
+
+def csv_fields(rows: str = 'analyses', flatten: bool = False) -> List[str]:
+    """
+    CSV columns for a row shape. Fixed up front rather than taken from the
+    first record, whose categories may lack metrics that later ones have.
+    """
+    if rows == 'recommendations':
+        return RECOMMENDATION_FIELDS
+    if not flatten:
+        return ANALYSIS_FIELDS + ['result']
+    fields = list(ANALYSIS_FIELDS)
+    for name, metrics in CATEGORY_METRICS.items():
+        fields.append(f'{name}_score')
+        fields += [f'{name}_{_slug(metric)}' for metric in metrics]
+    return fields
+
+
+def analysis_record(analysis_id: int, url: str, host: str, created_at, result: Dict[str, Any],
+                    flatten: bool = False) -> Dict[str, Any]:
+    record = {
+        'id': analysis_id,
+        'url': url,
+        'host': host,
+        'created_at': created_at.isoformat(),
+        'overall_score': result.get('overall_score'),
+        'topic': result.get('topic'),
+        'author': result.get('author'),
+    }
+    if flatten:
+        record.update(flatten_categories(result.get('categories', {})))
+    else:
+        record['result'] = result
+    return record
+
+
+def recommendation_records(analysis_id: int, url: str, result: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    for recommendation in result.get('recommendations', []):
+        yield {
+            'analysis_id': analysis_id,
+            'url': url,
+            **{field: recommendation.get(field, '') for field in RECOMMENDATION_FIELDS[2:]},
+        }
+
+
+def iter_records(analyses, rows: str = 'analyses', flatten: bool = False,
+                 is_premium: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Export records for a queryset of Analysis rows, oldest first, read in chunks.
+    """
+    columns = analyses.order_by('created_at', 'pk').values_list('pk', 'url', 'host', 'created_at', 'result')
+    for analysis_id, url, host, created_at, result in columns.iterator(chunk_size=CHUNK_SIZE):
+        if not isinstance(result, dict):
+            continue
+        result = result_for_tier(result, is_premium)
+        if rows == 'recommendations':
+            yield from recommendation_records(analysis_id, url, result)
+        else:
+            yield analysis_record(analysis_id, url, host, created_at, result, flatten=flatten)
+
+
+def csv_lines(records: Iterable[Dict[str, Any]], rows: str = 'analyses', flatten: bool = False) -> Iterator[str]:
+    """
+    CSV text: the header (see csv_fields), then one line per record.
+    """
+    writer = csv.DictWriter(Echo(), fieldnames=csv_fields(rows, flatten), extrasaction='ignore')
+    yield writer.writeheader()
+    for record in records:
+        if 'result' in record:
+            # Nested payload in a single cell when not flattened
+            record = {**record, 'result': json.dumps(record['result'], separators=(',', ':'))}
+        yield writer.writerow(record)
+
+
+def jsonl_lines(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, separators=(',', ':'), default=str) + '\n'
+
+
+def export_lines(analyses, fmt: str = 'csv', rows: str = 'analyses', flatten: bool = False,
+                 is_premium: bool = True) -> Iterator[str]:
+    """
+    The whole export of analyses as a stream of text chunks.
+    """
+    records = iter_records(analyses, rows=rows, flatten=flatten, is_premium=is_premium)
+    if fmt == 'jsonl':
+        return jsonl_lines(records)
+    return csv_lines(records, rows=rows, flatten=flatten)
+
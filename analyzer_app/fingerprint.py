@@ -0,0 +1,119 @@
+"""
+SimHash fingerprints for near-duplicate page detection.
+
+Pages whose fingerprints differ in at most MAX_DISTANCE bits are treated as
+the same article (tag pages, ?utm_ variants, AMP and print views). The 64-bit
+hash is split into BANDS bands; by the pigeonhole principle two fingerprints
+within MAX_DISTANCE bits share at least one band exactly, so candidates are
+found by exact band lookups instead of comparing against every stored page.
+"""
+import hashlib
+from collections import Counter
+from typing import Dict, Hashable, List, Optional, Set
+
+import numpy as np
+
+from .tokens import WORD_RE
+
+BITS = 64
+BANDS = 4
+BAND_BITS = BITS // BANDS
+MAX_DISTANCE = 3
+SHINGLE_SIZE = 3
+# Texts with fewer distinct shingles (nav-only pages, failed extractions) are
+# too generic for their fingerprints to identify an article
+MIN_SHINGLES = 50
+
+_BIT_SHIFTS = np.arange(BITS, dtype=np.uint64)
+
+
+def _feature_hash(feature: str) -> int:
+    # Must be stable across processes (fingerprints are stored), so no hash()
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def content_hash(text: str) -> str:
+    """
+    Hash of a page's visible text, so the same post served under different
+    URLs (or with a different cache-busting script tag) is only analyzed once.
+    """
+    return hashlib.sha1(" ".join(text.split()).encode('utf-8')).hexdigest()
+
+
+def shingles(text: str) -> Counter:
+    """
+    Counts of the lowercased word shingles of text (single words for tiny texts).
+    """
+    words = [w.lower() for w in WORD_RE.findall(text)]
+    if len(words) >= SHINGLE_SIZE:
+        return Counter(" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+    return Counter(words)
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash over word shingles of text.
+    """
+    features = shingles(text)
+    if not features:
+        return 0
+
+    hashes = np.fromiter((_feature_hash(f) for f in features), dtype=np.uint64, count=len(features))
+    weights = np.fromiter(features.values(), dtype=np.int64, count=len(features))
+    bits = ((hashes[:, None] >> _BIT_SHIFTS) & np.uint64(1)).astype(np.int64)
+    votes = (weights[:, None] * (2 * bits - 1)).sum(axis=0)
+    return int(sum(1 << i for i in np.flatnonzero(votes > 0)))
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def bands(fingerprint: int) -> List[int]:
+    """
+    Splits a fingerprint into BANDS integers of BAND_BITS bits each.
+    """
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (i * BAND_BITS)) & mask for i in range(BANDS)]
+
+
+def to_signed(fingerprint: int) -> int:
+    # Database BigIntegerFields are signed 64-bit
+    return fingerprint - (1 << BITS) if fingerprint >= 1 << (BITS - 1) else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << BITS) if value < 0 else value
+
+
+class SimHashIndex:
+    """
+    In-memory LSH index for batch jobs (crawls, topic training).
+    """
+
+    def __init__(self, max_distance: int = MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.fingerprints: Dict[Hashable, int] = {}
+        self.buckets: List[Dict[int, Set[Hashable]]] = [{} for _ in range(BANDS)]
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def add(self, key: Hashable, fingerprint: int) -> None:
+        self.fingerprints[key] = fingerprint
+        for band, value in enumerate(bands(fingerprint)):
+            self.buckets[band].setdefault(value, set()).add(key)
+
+    def find(self, fingerprint: int) -> Optional[Hashable]:
+        """
+        Returns the key of the closest indexed near-duplicate, if any.
+        """
+        candidates = set()
+        for band, value in enumerate(bands(fingerprint)):
+            candidates |= self.buckets[band].get(value, set())
+        best_key, best_distance = None, self.max_distance + 1
+        for key in candidates:
+            distance = hamming_distance(fingerprint, self.fingerprints[key])
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+        return best_key
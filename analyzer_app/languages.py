@@ -0,0 +1,186 @@
+"""
+Language detection and per-language NLP resources.
+
+analyze_page detects the article's language first and then asks for its
+LanguageBundle: stemmer, stop words, sentence tokenizer, sentiment engine,
+rule packs (grammar, seasonal keywords), readability and topic models. Bundles are built
+lazily, once per process and language; a resource that isn't available for
+a language is None/empty, and the stages that need it are skipped instead
+of producing English scores for non-English text. English resources are
+always expected, so one missing there (NLTK data not downloaded) is logged.
+"""
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional
+
+from .phrases import DEFAULT_BACKEND
+from .tokens import LETTER_WORD_RE
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_LANGUAGE = 'english'
+UNKNOWN_LANGUAGE = 'unknown'
+
+logger = logging.getLogger(__name__)
+
+# Detection looks at the first words only; shorter texts are assumed English
+DETECTION_WORDS = 1000
+MIN_DETECTION_WORDS = 20
+# ...unless their "words" are long runs of unsegmented script
+MIN_DETECTION_LETTERS = 200
+# Share of the sampled words that must be stop words of the winning language
+MIN_STOP_WORD_RATIO = 0.1
+# sumy ships stop words for these too, but they aren't written with spaces
+UNSEGMENTED_LANGUAGES = {'chinese', 'japanese'}
+
+GRAMMAR_RULES = {
+    'english': {
+        " their is ": "there is",
+        " i ": " I ",
+        " dont ": " don't ",
+        " cant ": " can't ",
+        " im ": " I'm ",
+        " u ": " you ",
+        " ur ": " your ",
+        " alot ": " a lot ",
+        " tehm ": " them ",
+        " recieve ": " receive ",
+        " seperate ": " separate ",
+    },
+}
+
+SEASONAL_KEYWORDS = {
+    'english': [
+        "christmas", "holiday", "santa", "gift", "present", "december",
+        "winter", "snow", "reindeer", "elf", "merry", "festive", "yuletide",
+        "stocking", "ornament", "tree", "mistletoe"
+    ],
+}
+
+
+class LanguageBundle(NamedTuple):
+    language: str
+    stop_words: FrozenSet[str]
+    stemmer: Optional[Any]
+    tokenizer: Optional[Any]
+    sentiment: Optional[Any]  # SentimentEngine
+    grammar_rules: Dict[str, str]
+    seasonal_keywords: List[str]
+    phrase_backend: str
+    readability: bool
+    topic_models_path: str
+
+    @property
+    def can_summarize(self) -> bool:
+        return self.stemmer is not None and self.tokenizer is not None
+
+    def topic_models(self) -> Dict[str, Any]:
+        return load_topic_models(self.topic_models_path)
+
+
+@lru_cache(maxsize=None)
+def stop_words(language: str) -> FrozenSet[str]:
+    from sumy.utils import get_stop_words
+
+    try:
+        return frozenset(get_stop_words(language))
+    except LookupError:
+        return frozenset()
+
+
+@lru_cache(maxsize=1)
+def detectable_languages() -> List[str]:
+    import sumy
+
+    directory = os.path.join(os.path.dirname(sumy.__file__), 'data', 'stopwords')
+    names = sorted(name[:-4] for name in os.listdir(directory) if name.endswith('.txt'))
+    return [name for name in names if name not in UNSEGMENTED_LANGUAGES]
+
+
+def detect_language(text: str) -> str:
+    """
+    The language whose stop words cover most of the text's first words.
+    Short texts count as English; texts no stop-word list covers well enough
+    (including Chinese and Japanese) are UNKNOWN_LANGUAGE.
+    """
+    words = []
+    for match in LETTER_WORD_RE.finditer(text):
+        words.append(match.group().lower())
+        if len(words) >= DETECTION_WORDS:
+            break
+    if len(words) < MIN_DETECTION_WORDS and sum(map(len, words)) < MIN_DETECTION_LETTERS:
+        return DEFAULT_LANGUAGE
+
+    best_language, best_hits = UNKNOWN_LANGUAGE, 0
+    for language in detectable_languages():
+        language_stop_words = stop_words(language)
+        hits = sum(1 for word in words if word in language_stop_words)
+        # Ties go to English, the language everything was built for
+        if hits > best_hits or (hits == best_hits and language == DEFAULT_LANGUAGE):
+            best_language, best_hits = language, hits
+    if best_hits < MIN_STOP_WORD_RATIO * len(words):
+        return UNKNOWN_LANGUAGE
+    return best_language
+
+
+def topic_models_path(language: str) -> str:
+    if language == DEFAULT_LANGUAGE:
+        return os.path.join(BASE_DIR, 'topic_models.json')
+    return os.path.join(BASE_DIR, f'topic_models.{language}.json')
+
+
+def load_topic_models(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Topic models from path (English by default). The parsed file is cached
+    until it changes on disk, so retraining needs no restart.
+    """
+    if path is None:
+        path = topic_models_path(DEFAULT_LANGUAGE)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    return _read_topic_models(path, mtime)
+
+
+@lru_cache(maxsize=16)
+def _read_topic_models(path: str, mtime: int) -> Dict[str, Any]:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _optional(language, factory, *args):
+    try:
+        return factory(*args)
+    except LookupError as e:  # unsupported language or missing NLTK data
+        if language == DEFAULT_LANGUAGE:
+            logger.warning("%s unavailable for %s, its stages will be skipped: %s",
+                           getattr(factory, '__name__', factory), language, e)
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_bundle(language: str) -> LanguageBundle:
+    from sumy.nlp.stemmers import Stemmer
+    from sumy.nlp.tokenizers import Tokenizer
+
+    from .sentiment import get_sentiment_engine
+
+    if language == UNKNOWN_LANGUAGE:
+        return LanguageBundle(language, frozenset(), None, None, None, {}, [], DEFAULT_BACKEND, False, '')
+    return LanguageBundle(
+        language=language,
+        stop_words=stop_words(language),
+        stemmer=_optional(language, Stemmer, language),
+        tokenizer=_optional(language, Tokenizer, language),
+        # VADER's lexicon and booster/negation rules are English
+        sentiment=_optional(language, get_sentiment_engine) if language == DEFAULT_LANGUAGE else None,
+        grammar_rules=GRAMMAR_RULES.get(language, {}),
+        seasonal_keywords=SEASONAL_KEYWORDS.get(language, []),
+        # TextBlob's noun-phrase model is English; n-grams work everywhere
+        phrase_backend=DEFAULT_BACKEND if language == DEFAULT_LANGUAGE else 'ngram',
+        # Syllable estimates and the grade-level formulas are English
+        readability=language == DEFAULT_LANGUAGE,
+        topic_models_path=topic_models_path(language),
+    )
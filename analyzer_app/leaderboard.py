@@ -0,0 +1,186 @@
+"""
+Leaderboards of the most improved (and best scoring) blogs.
+
+Every saved analysis updates its page's LeaderboardEntry on each board
+that is open at that moment: the all-time board, the current ISO week and
+any running seasonal challenge. Entries are keyed by normalized URL, so an
+improvement always compares analyses of the same page. An entry keeps the
+page's first, best and latest overall score within the board's window, so
+the improvement delta is maintained incrementally. Reading a board is one indexed top-N query,
+and its result is cached until the next update to that board.
+"""
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .logic import normalize_url
+from .models import Analysis, LeaderboardEntry
+
+ALL_TIME = 'all'
+BOARD_SIZE = 10
+BOARD_CACHE_TIMEOUT = 60 * 60
+ORDERS = {
+    'improved': ('-improvement', '-latest_score'),
+    'best': ('-best_score', '-improvement'),
+}
+# (name, first day, last day) as (month, day); windows may wrap into January
+SEASONAL_CHALLENGES = [
+    ('christmas', (12, 1), (1, 6)),
+]
+
+
+def weekly_board(when: datetime) -> str:
+    year, week, _ = when.isocalendar()
+    return f'week:{year}-W{week:02d}'
+
+
+def seasonal_board(when: datetime) -> Optional[str]:
+    """
+    The seasonal challenge running at when, if any, keyed by the year it started.
+    """
+    day = (when.month, when.day)
+    for name, start, end in SEASONAL_CHALLENGES:
+        if start <= end:
+            if start <= day <= end:
+                return f'{name}-{when.year}'
+        elif day >= start:
+            return f'{name}-{when.year}'
+        elif day <= end:
+            return f'{name}-{when.year - 1}'
+    return None
+
+
+def open_boards(when: datetime) -> List[str]:
+    boards = [ALL_TIME, weekly_board(when)]
+    season = seasonal_board(when)
+    if season:
+        boards.append(season)
+    return boards
+
+
+def _cache_key(board: str, topic: Optional[str], order: str) -> str:
+    return f'leaderboard:{board}:{topic or "*"}:{order}'
+
+
+def record_analysis(url: str, data: Dict[str, Any], when: Optional[datetime] = None) -> None:
+    """
+    Folds one saved analysis of url into every board open at when.
+    """
+    score = data.get('overall_score')
+    if not url or not isinstance(score, (int, float)):
+        return
+    host = urlsplit(url).netloc.lower()
+    url = normalize_url(url)
+    url_hash = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    score = max(0, min(100, int(score)))
+    topic = data.get('topic') or 'Other'
+    author = str(data.get('author') or '')[:255]
+    if author == 'Unknown Author':  # analyze_page's placeholder
+        author = ''
+    boards = open_boards(when or timezone.now())
+
+    topics = {None, topic}
+    with transaction.atomic():
+        for board in boards:
+            entry, created = LeaderboardEntry.objects.select_for_update().get_or_create(
+                board=board, url_hash=url_hash,
+                defaults={
+                    'url': url, 'host': host, 'topic': topic, 'author': author,
+                    'first_score': score, 'best_score': score, 'latest_score': score,
+                },
+            )
+            if created:
+                continue
+            # A reclassified page also leaves its old topic's boards
+            topics.add(entry.topic)
+            entry.topic = topic
+            entry.author = author or entry.author
+            entry.latest_score = score
+            entry.best_score = max(entry.best_score, score)
+            entry.improvement = score - entry.first_score
+            entry.analyses = F('analyses') + 1
+            entry.save()
+
+        keys = [_cache_key(board, key_topic, order) for board in boards for key_topic in topics for order in ORDERS]
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def top(board: str = ALL_TIME, topic: Optional[str] = None, order: str = 'improved',
+        limit: int = BOARD_SIZE) -> List[Dict[str, Any]]:
+    """
+    The board's top entries (at most BOARD_SIZE), optionally for one topic.
+    The "improved" order only lists sites that actually improved.
+    """
+    key = _cache_key(board, topic, order)
+    rows = cache.get(key)
+    if rows is None:
+        entries = LeaderboardEntry.objects.filter(board=board)
+        if topic:
+            entries = entries.filter(topic=topic)
+        if order == 'improved':
+            entries = entries.filter(improvement__gt=0)
+        rows = [
+            {
+                'url': entry.url,
+                'host': entry.host,
+                'topic': entry.topic,
+                'author': entry.author,
+                'initials': _initials(entry.author or entry.host.removeprefix('www.').split('.')[0]),
+                'best_score': entry.best_score,
+                'latest_score': entry.latest_score,
+                'improvement': entry.improvement,
+                'growth': round(100 * entry.improvement / entry.first_score) if entry.first_score else None,
+                'analyses': entry.analyses,
+            }
+            for entry in entries.order_by(*ORDERS[order])[:BOARD_SIZE]
+        ]
+        cache.set(key, rows, BOARD_CACHE_TIMEOUT)
+    return rows[:limit]
+
+
+def dashboard_boards(topic: Optional[str] = None, when: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    The boards shown on the premium dashboard, as {"title", "board", "entries"}.
+    """
+    when = when or timezone.now()
+    boards = [('Most Improved This Week', weekly_board(when), 'improved')]
+    season = seasonal_board(when)
+    if season:
+        boards.append((f"{season.rsplit('-', 1)[0].title()} Challenge", season, 'improved'))
+    boards += [('Most Improved All Time', ALL_TIME, 'improved'), ('Top Scores', ALL_TIME, 'best')]
+    return [
+        {'title': title, 'board': board, 'order': order, 'entries': top(board, topic=topic, order=order)}
+        for title, board, order in boards
+    ]
+
+
+def _initials(name: str) -> str:
+    words = [word for word in name.replace('.', ' ').split() if word[0].isalnum()]
+    return "".join(word[0] for word in words[:2]).upper() or "?"
+
+
+def rebuild_leaderboards() -> int:
+    """
+    Replays every stored analysis, oldest first, into fresh boards.
+    Returns the number of analyses replayed.
+    """
+    replayed = 0
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        analyses = Analysis.objects.order_by('created_at').values_list('url', 'result', 'created_at')
+        for url, data, created_at in analyses.iterator():
+            if isinstance(data, dict):
+                record_analysis(url, data, when=created_at)
+                replayed += 1
+    topics = [None] + list(LeaderboardEntry.objects.values_list('topic', flat=True).distinct())
+    cache.delete_many([
+        _cache_key(board, topic, order)
+        for board in open_boards(timezone.now()) for topic in topics for order in ORDERS
+    ])
+    return replayed
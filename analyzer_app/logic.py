@@ -1,40 +1,56 @@
 import requests
 from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Tuple
-import json
-import os
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 import random
-from textblob import TextBlob
-from collections import Counter
 
-def fetch_page(url: str) -> str:
+# Mimic a real Chrome browser to bypass basic anti-bot checks
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+# Query parameters that only track where a visitor came from
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'ref_src'}
+
+def fetch_response(url: str) -> requests.Response:
     try:
-        # Mimic a real Chrome browser to bypass basic anti-bot checks
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-        }
-        
         # Create a session to handle cookies/redirects better
         session = requests.Session()
-        response = session.get(url, timeout=15, headers=headers)
+        response = session.get(url, timeout=15, headers=BROWSER_HEADERS)
         response.raise_for_status()
-        return response.text
+        return response
     except requests.RequestException as e:
         raise ValueError(f"Failed to fetch URL: {str(e)}")
 
-def load_topic_models():
-    try:
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        path = os.path.join(base_dir, 'topic_models.json')
-        with open(path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+def fetch_page(url: str) -> str:
+    return fetch_response(url).text
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for de-duplication: lowercase scheme and host,
+    no default port, fragment or tracking parameters, sorted query string.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or 'https'
+    host = (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
 import nltk
+from .content import extract_main_content
+from .languages import DEFAULT_LANGUAGE, LanguageBundle, detect_language, get_bundle, load_topic_models
+from .nlp_cache import sentence_tags
+from .phrases import DEFAULT_BACKEND, extract_noun_phrases
+from .readability import TARGET_GRADE, analyze_readability, readability
+from .sentiment import get_sentiment_engine
+from .tokens import tokenize
 
 # Ensure VADER lexicon is downloaded (safe to call multiple times)
 try:
@@ -42,13 +58,14 @@ try:
 except LookupError:
     nltk.download('vader_lexicon')
 
-def detect_topic(text: str, topic_models: Dict) -> Tuple[str, List[str]]:
+def detect_topic(text: str, topic_models: Dict, backend: str = DEFAULT_BACKEND,
+                 parallel: bool = False, language: str = DEFAULT_LANGUAGE) -> Tuple[str, List[str]]:
     if not topic_models:
         return "Other", []
     
-    blob = TextBlob(text)
     # Get keywords from the text
-    phrases = [p.lower() for p in blob.noun_phrases if len(p) > 3]
+    phrases = [p for p in extract_noun_phrases(text, backend=backend, parallel=parallel, language=language)
+               if len(p) > 3]
     text_keywords = set(phrases)
     
     best_topic = "Other"
@@ -69,10 +86,10 @@ def detect_topic(text: str, topic_models: Dict) -> Tuple[str, List[str]]:
             
     return best_topic, best_matches
 
-def analyze_sentiment_and_improvements(text: str) -> Dict[str, Any]:
-    sia = SentimentIntensityAnalyzer()
-    sentiment_scores = sia.polarity_scores(text)
-    compound_score = sentiment_scores['compound'] # -1 to 1
+def analyze_sentiment_and_improvements(text: str, engine=None) -> Dict[str, Any]:
+    engine = engine or get_sentiment_engine()
+    result = engine.score(text)
+    compound_score = result.compound # -1 to 1
     
     # Labeling
     if compound_score >= 0.05:
@@ -82,59 +99,88 @@ def analyze_sentiment_and_improvements(text: str) -> Dict[str, Any]:
     else:
         label = "Neutral"
 
-    # Identify words to improve using VADER lexicon + TextBlob tagging
-    # We use TextBlob to find Adjectives/Adverbs, then check their VADER score
-    blob = TextBlob(text)
-    improvements = []
-    
-    for word, tag in blob.tags:
-        if tag in ['JJ', 'JJR', 'JJS', 'RB', 'RBR', 'RBS']: # Adjectives and Adverbs
-            # Check if word is in VADER lexicon and is negative
-            if word.lower() in sia.lexicon and sia.lexicon[word.lower()] < -0.5:
-                improvements.append({
-                    "word": word,
-                    "context": f"...{word}...", 
-                    "suggestion": "Consider a more positive alternative"
-                })
-    
-    # Limit to top 5 unique improvements
+    sentences = [
+        {"start": start, "end": end, "score": round(float(score), 4)}
+        for (start, end), score in zip(result.sentences, result.sentence_scores)
+    ]
+
+    # Identify words to improve: strongly negative lexicon hits, confirmed as
+    # Adjectives/Adverbs by tagging only the sentences they occur in
     unique_improvements = []
     seen_words = set()
-    for item in improvements:
-        if item['word'].lower() not in seen_words:
-            unique_improvements.append(item)
-            seen_words.add(item['word'].lower())
+    
+    for sentence_index, negative_words in enumerate(result.negative_words):
         if len(unique_improvements) >= 5:
             break
+        if not negative_words:
+            continue
+        start, end = result.sentences[sentence_index]
+        modifiers = {
+            w.lower() for w, tag in sentence_tags(text[start:end])
+            if tag in ['JJ', 'JJR', 'JJS', 'RB', 'RBR', 'RBS'] # Adjectives and Adverbs
+        }
+        for word, relative_offset in negative_words:
+            if word.lower() in seen_words or word.lower() not in modifiers:
+                continue
+            offset = start + relative_offset
+            unique_improvements.append({
+                "word": word,
+                "context": _context_snippet(text, start, end, offset, len(word)),
+                "offset": offset,
+                "sentence_score": sentences[sentence_index]["score"],
+                "suggestion": "Consider a more positive alternative"
+            })
+            seen_words.add(word.lower())
+            # Limit to top 5 unique improvements
+            if len(unique_improvements) >= 5:
+                break
             
     return {
         "score": compound_score,
         "label": label,
-        "improvements": unique_improvements
+        "improvements": unique_improvements,
+        "sentences": sentences
     }
 
+def _context_snippet(text: str, start: int, end: int, offset: int, length: int, width: int = 60) -> str:
+    """
+    Returns the part of the sentence around a word, with ellipses where it was cut.
+    """
+    left = max(start, offset - width)
+    right = min(end, offset + length + width)
+    snippet = " ".join(text[left:right].split())
+    return f"{'...' if left > start else ''}{snippet}{'...' if right < end else ''}"
+
 from sumy.parsers.html import HtmlParser
-from sumy.nlp.tokenizers import Tokenizer
+from sumy.parsers.plaintext import PlaintextParser
 from sumy.summarizers.lsa import LsaSummarizer
-from sumy.nlp.stemmers import Stemmer
-from sumy.utils import get_stop_words
 
-def summarize_blog(url: str, sentence_count: int = 6) -> str:
+def summarize_blog(url: str, sentence_count: int = 6, html: str = "", text: str = "",
+                   bundle: LanguageBundle = None) -> str:
     """
     Summarizes the blog post content using LSA (Latent Semantic Analysis).
     Works on Mac ARM64 with open-source libraries only.
+    Pass the already extracted article text (or at least the fetched html) to
+    avoid downloading and parsing the page a second time, and the language
+    bundle when the language is already known (English otherwise).
     """
     try:
-        LANGUAGE = "english"
-        parser = HtmlParser.from_url(url, Tokenizer(LANGUAGE))
+        bundle = bundle or get_bundle(DEFAULT_LANGUAGE)
+        if not bundle.can_summarize:
+            return "Summary generation unavailable for this language."
+        if text:
+            parser = PlaintextParser.from_string(text, bundle.tokenizer)
+        elif html:
+            parser = HtmlParser.from_string(html, url, bundle.tokenizer)
+        else:
+            parser = HtmlParser.from_url(url, bundle.tokenizer)
         
         # Check if document has content
         if not parser.document or not parser.document.sentences:
             return "Unable to extract sufficient content from this URL for summarization."
         
-        stemmer = Stemmer(LANGUAGE)
-        summarizer = LsaSummarizer(stemmer)
-        summarizer.stop_words = get_stop_words(LANGUAGE)
+        summarizer = LsaSummarizer(bundle.stemmer)
+        summarizer.stop_words = bundle.stop_words
 
         summary = []
         for sentence in summarizer(parser.document, sentence_count):
@@ -153,28 +199,19 @@ def summarize_blog(url: str, sentence_count: int = 6) -> str:
     except Exception as e:
         return f"Summary generation unavailable. Please ensure the URL is accessible and contains readable text content."
 
-def check_grammar(text: str) -> Tuple[int, List[Dict]]:
+def check_grammar(text: str, common_errors: Dict[str, str] = None, long_sentences: int = None) -> Tuple[int, List[Dict]]:
     """
     Simple rule-based grammar/style checker since we might not have language_tool_python installed.
     In a real app, use a library like language_tool_python.
+    common_errors maps mistakes to corrections (the English rule pack by default);
+    long_sentences is the count from readability analysis, if already done.
     """
     issues = []
     score = 100
     
     # 1. Check for common errors
-    common_errors = {
-        " their is ": "there is",
-        " i ": " I ",
-        " dont ": " don't ",
-        " cant ": " can't ",
-        " im ": " I'm ",
-        " u ": " you ",
-        " ur ": " your ",
-        " alot ": " a lot ",
-        " tehm ": " them ",
-        " recieve ": " receive ",
-        " seperate ": " separate ",
-    }
+    if common_errors is None:
+        common_errors = get_bundle(DEFAULT_LANGUAGE).grammar_rules
     
     lower_text = text.lower()
     for error, correction in common_errors.items():
@@ -188,27 +225,24 @@ def check_grammar(text: str) -> Tuple[int, List[Dict]]:
             })
             
     # 2. Check for very long sentences (readability/style)
-    sentences = text.split('.')
-    long_sentences = [s for s in sentences if len(s.split()) > 30]
+    if long_sentences is None:
+        long_sentences = readability(text).long_sentences
     if long_sentences:
-        score -= (len(long_sentences) * 3)
+        score -= (long_sentences * 3)
         issues.append({
             "type": "Style",
-            "desc": f"Found {len(long_sentences)} very long sentences. Consider breaking them up.",
-            "count": len(long_sentences)
+            "desc": f"Found {long_sentences} very long sentences. Consider breaking them up.",
+            "count": long_sentences
         })
         
     return max(0, score), issues
 
-def check_seasonal_content(text: str) -> Dict[str, Any]:
+def check_seasonal_content(text: str, christmas_keywords: List[str] = None) -> Dict[str, Any]:
     """
     Checks for Christmas/Holiday related content.
     """
-    christmas_keywords = [
-        "christmas", "holiday", "santa", "gift", "present", "december", 
-        "winter", "snow", "reindeer", "elf", "merry", "festive", "yuletide",
-        "stocking", "ornament", "tree", "mistletoe"
-    ]
+    if christmas_keywords is None:
+        christmas_keywords = get_bundle(DEFAULT_LANGUAGE).seasonal_keywords
     
     lower_text = text.lower()
     found_keywords = []
@@ -247,25 +281,70 @@ def generate_fix_content(issue_title: str, context: str = "") -> str:
         
     return "AI Suggestion: Review this section and aim for clarity and conciseness."
 
-def analyze_page(html: str, url: str = "") -> Dict[str, Any]:
-    soup = BeautifulSoup(html, 'html.parser')
-    topic_models = load_topic_models()
-    
-    # Clean text for NLP
+def extract_text(soup: BeautifulSoup) -> str:
+    """
+    Removes scripts and styles from soup and returns the article body for NLP.
+    Navigation, footers, banners and comment widgets are left out.
+    """
     for script in soup(["script", "style"]):
         script.extract()
-    text = soup.get_text()
+    return extract_main_content(soup)
+
+class ParsedPage(NamedTuple):
+    soup: BeautifulSoup  # scripts and styles already removed
+    text: str
+
+def parse_page(html: str) -> ParsedPage:
+    """
+    Parses html once for callers that need both the extracted text and analyze_page().
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    return ParsedPage(soup, extract_text(soup))
+
+def page_text(html: str) -> str:
+    return parse_page(html).text
+
+def analyze_page(html: str, url: str = "", resource_audit: bool = False,
+                 parsed: Optional[ParsedPage] = None, parallel: bool = False) -> Dict[str, Any]:
+    """
+    Full analysis of a fetched page. With resource_audit, the page's images
+    and links are also checked over the network (see resources.py). Pass the
+    parse_page() result when the caller already has it to skip parsing again.
+    Batch jobs may pass parallel=True to extract noun phrases in the process
+    pool; request handlers never should.
+    """
+    # Clean text for NLP
+    soup, text = parsed if parsed is not None else parse_page(html)
+    
+    # --- 0. Language Detection ---
+    # Stages without resources for the language are skipped, not run on English rules
+    language = detect_language(text)
+    bundle = get_bundle(language)
+    skipped_stages = []
     
     # --- 1. Topic Detection ---
-    detected_topic, matched_keywords = detect_topic(text, topic_models)
+    topic_models = bundle.topic_models()
+    if topic_models:
+        detected_topic, matched_keywords = detect_topic(
+            text, topic_models, backend=bundle.phrase_backend, parallel=parallel, language=bundle.language,
+        )
+    else:
+        detected_topic, matched_keywords = "Other", []
+        skipped_stages.append("topic")
     
     #--- 2. Sentiment Analysis ---
-    sentiment_data = analyze_sentiment_and_improvements(text)
+    if bundle.sentiment:
+        sentiment_data = analyze_sentiment_and_improvements(text, engine=bundle.sentiment)
+    else:
+        sentiment_data = {"score": None, "label": "Unavailable", "improvements": [], "sentences": []}
+        skipped_stages.append("sentiment")
     
     # --- 3. AI Summary Generation ---
     summary = ""
     if url:
-        summary = summarize_blog(url)
+        summary = summarize_blog(url, text=text, bundle=bundle)
+        if not bundle.can_summarize:
+            skipped_stages.append("summary")
 
     # --- 4. Author & Social Media Detection ---
     author_name = "Unknown Author"
@@ -368,10 +447,31 @@ def analyze_page(html: str, url: str = "") -> Dict[str, Any]:
             "ai_fix": f"Add {words_needed} more words. Consider expanding on: 1) {detected_topic} fundamentals, 2) Real-world examples, 3) Expert tips, 4) Common mistakes to avoid."
         })
 
-    readability_score = random.randint(70, 95)
+    # Readability from the shared tokenization: grade levels and the hardest sentences
+    readability_data = None
+    readability_score = None
+    if bundle.readability:
+        readability_data = analyze_readability(tokenize(text))
+        readability_score = readability_data.score
+        if readability_data.flesch_kincaid_grade > TARGET_GRADE and readability_data.worst_sentences:
+            worst = readability_data.worst_sentences[0]
+            sentence = " ".join(text[worst['start']:worst['end']].split())
+            content_issues.append({
+                "priority": "MEDIUM",
+                "title": "Hard-to-Read Text",
+                "desc": f"Your article reads at grade {readability_data.flesch_kincaid_grade} (Flesch-Kincaid; Gunning Fog {readability_data.gunning_fog}). Aim for grade {TARGET_GRADE} or below.",
+                "ai_fix": f"Start with the hardest sentence (grade {worst['grade']}, {worst['words']} words): '{sentence[:150]}{'...' if len(sentence) > 150 else ''}' → Split it up and prefer shorter words."
+            })
+    else:
+        skipped_stages.append("readability")
     
     # ACTUAL GRAMMAR CHECK (not random)
-    grammar_score, grammar_issues = check_grammar(text)
+    grammar_score, grammar_issues = None, []
+    if bundle.grammar_rules:
+        long_sentences = readability_data.long_sentences if readability_data else None
+        grammar_score, grammar_issues = check_grammar(text, bundle.grammar_rules, long_sentences)
+    else:
+        skipped_stages.append("grammar")
     if grammar_issues:
         for issue in grammar_issues[:3]:  # Show top 3 grammar issues
             content_issues.append({
@@ -381,7 +481,13 @@ def analyze_page(html: str, url: str = "") -> Dict[str, Any]:
                 "ai_fix": f"Replace {issue.get('count', 1)} occurrence(s). Use Find & Replace in your editor to quickly fix all instances of this error."
             })
     
-    content_total = int((structure_score + readability_score + grammar_score) / 3)
+    content_metrics = [
+        {"name": "Readability", "value": readability_score},
+        {"name": "Grammar", "value": grammar_score},
+        {"name": "Structure", "value": structure_score}
+    ]
+    content_metrics = [metric for metric in content_metrics if metric["value"] is not None]
+    content_total = int(sum(metric["value"] for metric in content_metrics) / len(content_metrics))
 
 
     # --- 6. Visual Design ---
@@ -409,6 +515,38 @@ def analyze_page(html: str, url: str = "") -> Dict[str, Any]:
             "ai_fix": f"Example fix: <img src='your-image.jpg' alt='Descriptive text about the image showing {detected_topic}'> - Add similar descriptions to all {len(missing_alt)} images."
         })
 
+    # Optional resource audit: broken images, oversized hero images, dead links
+    resource_data = None
+    if resource_audit and url:
+        from .resources import LARGE_IMAGE_BYTES, audit_resources
+        resource_data = audit_resources(soup, url)
+        broken_images = resource_data["broken_images"]
+        if broken_images:
+            layout_score = max(0, layout_score - (len(broken_images) * 10))
+            visual_issues.append({
+                "priority": "HIGH",
+                "title": "Broken Images",
+                "desc": f"{len(broken_images)} image(s) failed to load. Visitors see empty boxes and search engines skip them.",
+                "ai_fix": "Fix or re-upload: " + ", ".join(f"{image['url'][:100]} ({image['status'] or 'no response'})" for image in broken_images[:3])
+            })
+        oversized = resource_data["oversized_images"]
+        if oversized:
+            hero = [image for image in oversized if image["hero"]]
+            visual_issues.append({
+                "priority": "HIGH" if hero else "MEDIUM",
+                "title": "Oversized Hero Image" if hero else "Oversized Images",
+                "desc": f"{len(oversized)} image(s) are over {LARGE_IMAGE_BYTES // 1024} KB" + (", including the first image readers see. Large hero images delay the first paint." if hero else ", which slows page loads on mobile."),
+                "ai_fix": f"Compress to under {LARGE_IMAGE_BYTES // 1024} KB and serve WebP/AVIF with srcset: " + ", ".join(f"{image['url'][:100]} ({image['bytes'] // 1024} KB)" for image in oversized[:3])
+            })
+        broken_links = resource_data["broken_links"]
+        if broken_links:
+            seo_issues.append({
+                "priority": "MEDIUM",
+                "title": "Broken Links",
+                "desc": f"{len(broken_links)} link(s) point to pages that no longer work. Dead links frustrate readers and waste crawl budget.",
+                "ai_fix": "Update or remove: " + ", ".join(f"{link['url'][:100]} ({link['status'] or 'no response'})" for link in broken_links[:3])
+            })
+
     viewport = soup.find('meta', attrs={'name': 'viewport'})
     mobile_score = 100
     if not viewport:
@@ -424,7 +562,11 @@ def analyze_page(html: str, url: str = "") -> Dict[str, Any]:
     visual_total = int((layout_score + mobile_score + color_score) / 3)
 
     # --- Seasonal Content Check ---
-    seasonal_data = check_seasonal_content(text)
+    if bundle.seasonal_keywords:
+        seasonal_data = check_seasonal_content(text, bundle.seasonal_keywords)
+    else:
+        seasonal_data = {"score": 0, "keywords": [], "message": "Seasonal check not available for this language."}
+        skipped_stages.append("seasonal")
     
     all_recommendations = seo_issues + content_issues + visual_issues + [{"priority": "LOW", "title": "Social Growth", "desc": rec, "ai_fix": f"Add social sharing buttons for {rec.split()[1]} to your blog sidebar or footer."} for rec in social_recommendations]
     
@@ -468,11 +610,7 @@ def analyze_page(html: str, url: str = "") -> Dict[str, Any]:
             },
             "content": {
                 "score": content_total,
-                "metrics": [
-                    {"name": "Readability", "value": readability_score},
-                    {"name": "Grammar", "value": grammar_score},
-                    {"name": "Structure", "value": structure_score}
-                ]
+                "metrics": content_metrics
             },
             "visual": {
                 "score": visual_total,
@@ -509,6 +647,10 @@ def analyze_page(html: str, url: str = "") -> Dict[str, Any]:
         },
         "recommendations": all_recommendations,
         "seasonal_data": seasonal_data,
-        "summary": summary
+        "readability": readability_data._asdict() if readability_data else None,
+        "resources": resource_data,
+        "summary": summary,
+        "language": language,
+        "skipped_stages": skipped_stages
     }
 
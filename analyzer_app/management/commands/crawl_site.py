@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from analyzer_app.crawler import DEFAULT_RATE, analyze_and_store, audit_site
+
+
+class Command(BaseCommand):
+    help = "Crawls a blog via its sitemaps, feeds and internal links and analyzes every post."
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help="Root URL of the site, e.g. https://example.com/")
+        parser.add_argument('--max-pages', type=int, default=100)
+        parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                            help="Maximum requests per second to the site (robots.txt Crawl-delay may lower it).")
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--max-depth', type=int, default=2, help="How many link hops to follow from the homepage.")
+        parser.add_argument('--no-links', action='store_true', help="Only use sitemaps and feeds.")
+
+    def handle(self, *args, **options):
+        def on_page(page):
+            analysis_id, data = analyze_and_store(page)
+            self.stdout.write(f"  [{analysis_id}] {page.url}: {data['overall_score']}/100")
+
+        processed = audit_site(
+            options['url'],
+            on_page=on_page,
+            max_pages=options['max_pages'],
+            rate=options['rate'],
+            workers=options['workers'],
+            max_depth=options['max_depth'],
+            follow_links=not options['no_links'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Analyzed {processed} page(s)."))
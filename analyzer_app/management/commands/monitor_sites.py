@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analyzer_app.monitor import BATCH_SIZE, DEFAULT_INTERVAL_HOURS, FETCH_WORKERS, register_site, run_due_checks
+
+
+class Command(BaseCommand):
+    help = "Re-audits monitored pages that are due, analyzing only the ones that changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--add', metavar='URL', action='append', default=[], help="Start monitoring a page.")
+        parser.add_argument('--interval-hours', type=int, default=DEFAULT_INTERVAL_HOURS,
+                            help="Check interval for pages added with --add.")
+        parser.add_argument('--limit', type=int, default=BATCH_SIZE, help="Maximum pages to check per run.")
+        parser.add_argument('--workers', type=int, default=FETCH_WORKERS)
+        parser.add_argument('--loop', action='store_true', help="Keep running, checking for due pages periodically.")
+        parser.add_argument('--sleep', type=int, default=300, help="Seconds between runs with --loop.")
+
+    def handle(self, *args, **options):
+        for url in options['add']:
+            site = register_site(url, interval_hours=options['interval_hours'])
+            self.stdout.write(f"Monitoring {site.url} every {site.interval_hours}h")
+
+        def on_site(site, outcome):
+            detail = f" ({site.last_error})" if outcome == 'failed' else ""
+            self.stdout.write(f"  {outcome:<13}{site.url}{detail}")
+
+        while True:
+            counts = run_due_checks(limit=options['limit'], workers=options['workers'], on_site=on_site)
+            if any(counts.values()):
+                summary = ", ".join(f"{count} {outcome.replace('_', ' ')}" for outcome, count in counts.items())
+                self.stdout.write(self.style.SUCCESS(f"Checked {sum(counts.values())} page(s): {summary}."))
+            if not options['loop']:
+                break
+            # A full batch means more pages are already due
+            if sum(counts.values()) < options['limit']:
+                time.sleep(options['sleep'])
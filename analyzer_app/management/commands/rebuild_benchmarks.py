@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from analyzer_app.benchmarks import rebuild_histograms
+
+
+class Command(BaseCommand):
+    help = "Recomputes the per-topic score histograms from every stored analysis and benchmarks.json."
+
+    def handle(self, *args, **options):
+        counted = rebuild_histograms()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt benchmarks from {counted} analysis(es)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from analyzer_app.leaderboard import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = "Rebuilds every leaderboard by replaying the stored analyses in order."
+
+    def handle(self, *args, **options):
+        replayed = rebuild_leaderboards()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt leaderboards from {replayed} analysis(es)."))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysis',
+            name='result_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
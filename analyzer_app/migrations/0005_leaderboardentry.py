@@ -0,0 +1,49 @@
+# Generated by Django 4.2 on 2026-10-19 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0004_scorehistogram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(max_length=32)),
+                ('host', models.CharField(max_length=255)),
+                ('topic', models.CharField(max_length=100)),
+                ('author', models.CharField(blank=True, default='', max_length=255)),
+                ('first_score', models.PositiveSmallIntegerField()),
+                ('best_score', models.PositiveSmallIntegerField()),
+                ('latest_score', models.PositiveSmallIntegerField()),
+                ('improvement', models.SmallIntegerField(default=0)),
+                ('analyses', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['board', '-improvement'], name='leaderboard_improved'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['board', 'topic', '-improvement'], name='leaderboard_topic_improved'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['board', '-best_score'], name='leaderboard_best'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['board', 'topic', '-best_score'], name='leaderboard_topic_best'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('board', 'host'), name='unique_board_host'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-19 03:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0005_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonitoredSite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2000)),
+                ('url_hash', models.CharField(max_length=40, unique=True)),
+                ('host', models.CharField(db_index=True, max_length=255)),
+                ('interval_hours', models.PositiveIntegerField(default=24)),
+                ('active', models.BooleanField(default=True)),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('content_hash', models.CharField(blank=True, default='', max_length=40)),
+                ('last_checked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_changed_at', models.DateTimeField(blank=True, null=True)),
+                ('next_check_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('last_error', models.CharField(blank=True, default='', max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_analysis', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='analyzer_app.analysis')),
+            ],
+        ),
+    ]
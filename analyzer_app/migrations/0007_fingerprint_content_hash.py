@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0006_monitoredsite'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fingerprint',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=40),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-19 03:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0007_fingerprint_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysis',
+            name='etag',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='analysis',
+            name='last_modified',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
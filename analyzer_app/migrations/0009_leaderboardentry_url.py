@@ -0,0 +1,40 @@
+# Generated by Django 4.2 on 2026-10-19 07:42
+
+from django.db import migrations, models
+
+
+def clear_entries(apps, schema_editor):
+    # Per-site entries can't be split into pages; rebuild them with
+    # `manage.py rebuild_leaderboards`
+    apps.get_model('analyzer_app', 'LeaderboardEntry').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0008_analysis_validators'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_entries, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='leaderboardentry',
+            name='unique_board_host',
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='url',
+            field=models.URLField(default='', max_length=2000),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='url_hash',
+            field=models.CharField(default='', max_length=40),
+            preserve_default=False,
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('board', 'url_hash'), name='unique_board_url'),
+        ),
+    ]
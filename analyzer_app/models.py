@@ -1,3 +1,127 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class Analysis(models.Model):
+    """
+    A stored analyze_page() result. Sessions only keep the id of this row.
+    """
+    url = models.URLField(max_length=2000)
+    host = models.CharField(max_length=255, db_index=True)
+    result = models.JSONField()
+    # sha256 of the canonical JSON result; doubles as the API's strong ETag
+    result_hash = models.CharField(max_length=64, blank=True, default='')
+    # Validators of the fetch this was analyzed from, to seed monitoring
+    etag = models.CharField(max_length=255, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = 'analyses'
+
+    def __str__(self):
+        return f"{self.url} ({self.created_at:%Y-%m-%d %H:%M})"
+
+
+class Fingerprint(models.Model):
+    """
+    SimHash of an analysis' page text, split into bands for near-duplicate
+    lookups (see fingerprint.py).
+    """
+    analysis = models.OneToOneField(Analysis, on_delete=models.CASCADE, related_name='fingerprint')
+    simhash = models.BigIntegerField()  # stored signed; see fingerprint.to_signed
+    band0 = models.PositiveIntegerField(db_index=True)
+    band1 = models.PositiveIntegerField(db_index=True)
+    band2 = models.PositiveIntegerField(db_index=True)
+    band3 = models.PositiveIntegerField(db_index=True)
+    # Exact text hash; only an exact match is reused across different sites
+    content_hash = models.CharField(max_length=40, blank=True, default='', db_index=True)
+
+    def __str__(self):
+        return f"{self.analysis_id}: {self.simhash:x}"
+
+
+class ScoreHistogram(models.Model):
+    """
+    Distribution of one category's scores across every analysis of a topic:
+    counts[s] is how many analyses scored s (0-100). Updated as analyses are
+    saved, so percentile ranks never scan the Analysis table (benchmarks.py).
+    """
+    topic = models.CharField(max_length=100)
+    category = models.CharField(max_length=32)
+    counts = models.JSONField(default=list)
+    total = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['topic', 'category'], name='unique_topic_category_histogram'),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} / {self.category} ({self.total})"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    One page's standing on one leaderboard ("all", "week:2026-W42",
+    "christmas-2026"). Kept up to date as analyses are saved, so boards are
+    read with an indexed top-N query instead of a scan of every analysis.
+    """
+    board = models.CharField(max_length=32)
+    url = models.URLField(max_length=2000)  # normalized; see logic.normalize_url
+    # sha1 of url, indexed in its place (too long for a unique index everywhere)
+    url_hash = models.CharField(max_length=40)
+    host = models.CharField(max_length=255)
+    topic = models.CharField(max_length=100)
+    author = models.CharField(max_length=255, blank=True, default='')
+    first_score = models.PositiveSmallIntegerField()
+    best_score = models.PositiveSmallIntegerField()
+    latest_score = models.PositiveSmallIntegerField()
+    # latest_score - first_score within the board's time window
+    improvement = models.SmallIntegerField(default=0)
+    analyses = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'url_hash'], name='unique_board_url'),
+        ]
+        indexes = [
+            models.Index(fields=['board', '-improvement'], name='leaderboard_improved'),
+            models.Index(fields=['board', 'topic', '-improvement'], name='leaderboard_topic_improved'),
+            models.Index(fields=['board', '-best_score'], name='leaderboard_best'),
+            models.Index(fields=['board', 'topic', '-best_score'], name='leaderboard_topic_best'),
+        ]
+
+    def __str__(self):
+        return f"{self.board}: {self.url} ({self.improvement:+d})"
+
+
+class MonitoredSite(models.Model):
+    """
+    A page re-audited on a schedule (see monitor.py). The validators and
+    content hash of the last fetch let unchanged pages be skipped without
+    running the analysis again.
+    """
+    url = models.URLField(max_length=2000)
+    # sha1 of normalize_url(url); one row per page however it was written
+    url_hash = models.CharField(max_length=40, unique=True)
+    host = models.CharField(max_length=255, db_index=True)
+    interval_hours = models.PositiveIntegerField(default=24)
+    active = models.BooleanField(default=True)
+    etag = models.CharField(max_length=255, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
+    content_hash = models.CharField(max_length=40, blank=True, default='')
+    last_analysis = models.ForeignKey(
+        Analysis, null=True, blank=True, on_delete=models.SET_NULL, related_name='+',
+    )
+    last_checked_at = models.DateTimeField(null=True, blank=True)
+    last_changed_at = models.DateTimeField(null=True, blank=True)
+    next_check_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.CharField(max_length=500, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.url
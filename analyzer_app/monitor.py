@@ -0,0 +1,183 @@
+"""
+Scheduled re-audits of monitored pages.
+
+Premium visitors' pages are registered as MonitoredSite rows. A periodic run
+(`manage.py monitor_sites`, from cron or with --loop) picks the due ones and
+spends as little as possible on those that didn't change:
+
+    1. conditional GET with the stored ETag / Last-Modified; 304 -> done
+    2. hash of the extracted article text; same as last time -> done
+    3. only then the full analysis, which is saved to the history like any
+       other (Analysis table, benchmarks, leaderboards)
+"""
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import requests
+from django.utils import timezone
+
+from .fingerprint import content_hash, simhash
+from .logic import BROWSER_HEADERS, normalize_url, parse_page
+from .models import Analysis, MonitoredSite
+from .store import analyze_and_save
+
+DEFAULT_INTERVAL_HOURS = 24
+BATCH_SIZE = 100
+FETCH_WORKERS = 4
+FETCH_TIMEOUT = 15
+TREND_POINTS = 10
+
+
+class ConditionalFetch(NamedTuple):
+    url: str
+    status: int  # 0 when the request failed
+    html: str
+    etag: str
+    last_modified: str
+    error: str
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+
+
+def register_site(url: str, interval_hours: int = DEFAULT_INTERVAL_HOURS,
+                  analysis_id: Optional[int] = None) -> MonitoredSite:
+    """
+    Starts monitoring url (or re-activates it). analysis_id, when given, is
+    the analysis the visitor just saw: the first check is scheduled one
+    interval later instead of right away, and starts from the content hash
+    and validators of the fetch that analysis came from.
+    """
+    defaults = {'url': url, 'host': urlsplit(url).netloc.lower(), 'interval_hours': interval_hours}
+    site, created = MonitoredSite.objects.get_or_create(url_hash=url_hash(url), defaults=defaults)
+    if created:
+        seed = None
+        if analysis_id is not None:
+            seed = (
+                Analysis.objects.filter(pk=analysis_id)
+                .values_list('url', 'etag', 'last_modified', 'fingerprint__content_hash').first()
+            )
+        if seed is not None:
+            analysis_url, etag, last_modified, digest = seed
+            site.last_analysis_id = analysis_id
+            site.next_check_at = timezone.now() + timedelta(hours=interval_hours)
+            site.content_hash = digest or ''
+            # A reused near duplicate was fetched from another URL; its validators don't apply here
+            if url_hash(analysis_url) == site.url_hash:
+                site.etag, site.last_modified = etag, last_modified
+            site.save(update_fields=['last_analysis', 'next_check_at', 'content_hash', 'etag', 'last_modified'])
+    elif not site.active:
+        site.active = True
+        site.save(update_fields=['active'])
+    return site
+
+
+def fetch_if_changed(url: str, etag: str = '', last_modified: str = '') -> ConditionalFetch:
+    headers = dict(BROWSER_HEADERS)
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    try:
+        response = requests.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except requests.RequestException as e:
+        return ConditionalFetch(url, 0, '', etag, last_modified, f"Failed to fetch URL: {e}"[:500])
+    return ConditionalFetch(
+        url, response.status_code, response.text if response.status_code == 200 else '',
+        response.headers.get('ETag', etag), response.headers.get('Last-Modified', last_modified), '',
+    )
+
+
+def due_sites(limit: int = BATCH_SIZE) -> List[MonitoredSite]:
+    return list(
+        MonitoredSite.objects.filter(active=True, next_check_at__lte=timezone.now())
+        .order_by('next_check_at')[:limit]
+    )
+
+
+def apply_fetch(site: MonitoredSite, fetched: ConditionalFetch) -> str:
+    """
+    Updates site from a fetch, analyzing the page if its content changed.
+    Returns the outcome: "failed", "not_modified", "unchanged" or "analyzed".
+    """
+    now = timezone.now()
+    site.last_checked_at = now
+    site.next_check_at = now + timedelta(hours=site.interval_hours)
+    site.last_error = fetched.error
+
+    if fetched.status == 0:
+        outcome = 'failed'
+    elif fetched.status == 304:
+        outcome = 'not_modified'
+    else:
+        parsed = parse_page(fetched.html)
+        digest = content_hash(parsed.text)
+        if digest == site.content_hash and site.last_analysis_id:
+            outcome = 'unchanged'
+        else:
+            # Reuse the parse we already have instead of parsing again
+            site.last_analysis_id, _ = analyze_and_save(
+                site.url, fetched.html, fingerprint=simhash(parsed.text), parsed=parsed,
+                etag=fetched.etag, last_modified=fetched.last_modified,
+            )
+            site.content_hash = digest
+            site.last_changed_at = now
+            outcome = 'analyzed'
+        site.etag, site.last_modified = fetched.etag, fetched.last_modified
+    site.save()
+    return outcome
+
+
+def run_due_checks(limit: int = BATCH_SIZE, workers: int = FETCH_WORKERS, on_site=None) -> Dict[str, int]:
+    """
+    Checks every due site once. Fetches run in parallel; analyses and database
+    writes stay on the calling thread. Returns a count per outcome.
+    """
+    sites = due_sites(limit)
+    counts = {'failed': 0, 'not_modified': 0, 'unchanged': 0, 'analyzed': 0}
+    if not sites:
+        return counts
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        fetches = pool.map(lambda site: fetch_if_changed(site.url, site.etag, site.last_modified), sites)
+        for site, fetched in zip(sites, fetches):
+            try:
+                outcome = apply_fetch(site, fetched)
+            except Exception as e:  # one broken page must not stop the run
+                site.last_error = f"Analysis failed: {e}"[:500]
+                site.save(update_fields=['last_error', 'last_checked_at', 'next_check_at'])
+                outcome = 'failed'
+            counts[outcome] += 1
+            if on_site:
+                on_site(site, outcome)
+    return counts
+
+
+def site_trends(urls: Iterable[str], points: int = TREND_POINTS) -> List[Dict[str, Any]]:
+    """
+    Recent overall scores of the monitored pages among urls, oldest first,
+    for the dashboard's progress charts.
+    """
+    hashes = {url_hash(url) for url in urls}
+    trends = []
+    for site in MonitoredSite.objects.filter(url_hash__in=hashes, active=True).order_by('url'):
+        # host is indexed; url alone would scan the whole table
+        history = Analysis.objects.filter(host=site.host, url=site.url).values_list('result', 'created_at')[:points]
+        scores = [
+            {'score': result.get('overall_score'), 'at': created_at}
+            for result, created_at in history if isinstance(result, dict)
+        ]
+        trends.append({
+            'url': site.url,
+            'last_checked_at': site.last_checked_at,
+            'last_changed_at': site.last_changed_at,
+            'next_check_at': site.next_check_at,
+            'scores': scores[::-1],
+        })
+    return trends
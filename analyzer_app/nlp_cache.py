@@ -0,0 +1,88 @@
+"""
+Bounded, process-wide LRU cache of per-sentence NLP results.
+
+Pages of the same blog repeat the same sidebar, author bio, newsletter pitch
+and footer sentences. Tags, noun phrases and sentiment for a sentence are
+computed once and reused by every later page (and every stage) that
+contains the same sentence.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+MAX_SENTENCES = 50000
+
+
+class SentenceCache:
+    """
+    LRU keyed by a hash of the sentence text. Each entry holds one value per
+    field (e.g. "tags", "np:fast_np:english", "sentiment").
+    """
+
+    def __init__(self, maxsize: int = MAX_SENTENCES):
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(sentence: str) -> bytes:
+        return hashlib.blake2b(sentence.encode('utf-8'), digest_size=16).digest()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, sentence: str, field: str) -> Optional[Any]:
+        key = self.key(sentence)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or field not in entry:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[field]
+
+    def set(self, sentence: str, field: str, value: Any) -> None:
+        key = self.key(sentence)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = {}
+                if len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+            else:
+                self.entries.move_to_end(key)
+            entry[field] = value
+
+    def get_or_compute(self, sentence: str, field: str, compute: Callable[[str], Any]) -> Any:
+        value = self.get(sentence, field)
+        if value is None:
+            value = compute(sentence)
+            self.set(sentence, field, value)
+        return value
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"sentences": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+sentence_cache = SentenceCache()
+
+
+def sentence_tags(sentence: str):
+    """
+    TextBlob POS tags of a single sentence, memoized.
+    """
+    def compute(text):
+        from textblob import TextBlob
+
+        return [(str(word), tag) for word, tag in TextBlob(text).tags]
+
+    return sentence_cache.get_or_compute(sentence, "tags", compute)
@@ -0,0 +1,193 @@
+"""
+Noun-phrase extraction service used by topic detection and training.
+
+Backends:
+    fast_np  TextBlob's FastNPExtractor (what TextBlob.noun_phrases uses),
+             applied per sentence instead of to the whole page.
+    regex    NLTK POS tags chunked with a JJ*/NN+ regular expression.
+    ngram    Stop-word-filtered word 1- and 2-grams; no tagging at all.
+             Uses the stop words of the text's language, so it also
+             serves languages without a tagger.
+
+Phrases are extracted per sentence and memoized in the shared sentence
+cache, so boilerplate repeated across a site is only processed once. The
+remaining sentences of long documents can be chunked and processed across
+a process pool; short ones are handled inline, since shipping them to a
+worker costs more than extracting them. Only batch jobs (training, crawls)
+use the pool. Request handlers extract inline, and the workers are started
+from a fork server, never forked from a threaded process.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .nlp_cache import sentence_cache
+from .tokens import LETTER_WORD_RE, WORD_RE, split_sentences
+
+DEFAULT_BACKEND = 'fast_np'
+# A sumy stop-word list name, like languages.DEFAULT_LANGUAGE
+DEFAULT_LANGUAGE = 'english'
+CHUNK_CHARS = 5000
+# Below this, a worker round-trip costs more than it saves
+PARALLEL_MIN_CHARS = 20000
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+CHUNK_GRAMMAR = r'NP: {<JJ.*>*<NN.*>+}'
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+@lru_cache(maxsize=1)
+def _fast_np_extractor():
+    from textblob.en.np_extractors import FastNPExtractor
+
+    extractor = FastNPExtractor()
+    extractor.train()
+    return extractor
+
+
+@lru_cache(maxsize=1)
+def _chunk_parser():
+    import nltk
+
+    return nltk.RegexpParser(CHUNK_GRAMMAR)
+
+
+@lru_cache(maxsize=None)
+def _stop_words(language: str):
+    # Imported here: languages imports this module
+    from .languages import stop_words
+
+    return stop_words(language)
+
+
+# Backends take (sentence, language). fast_np and regex only have English
+# models; language only changes ngram's stop words.
+
+def _fast_np(sentence: str, language: str) -> List[str]:
+    phrases = (p.strip().lower() for p in _fast_np_extractor().extract(sentence))
+    return [p for p in phrases if len(p) > 1]
+
+
+def _regex(sentence: str, language: str) -> List[str]:
+    import nltk
+
+    words = WORD_RE.findall(sentence)
+    if not words:
+        return []
+    phrases = []
+    for subtree in _chunk_parser().parse(nltk.pos_tag(words)).subtrees(lambda tree: tree.label() == 'NP'):
+        leaves = subtree.leaves()
+        # Like FastNP: multi-word chunks, or a lone proper noun
+        if len(leaves) > 1 or leaves[0][1].startswith('NNP'):
+            phrases.append(" ".join(word for word, tag in leaves).lower())
+    return phrases
+
+
+def _ngram(sentence: str, language: str) -> List[str]:
+    stop_words = _stop_words(language)
+    words = [w.lower() for w in LETTER_WORD_RE.findall(sentence)]
+    keep = [w.isalpha() and len(w) > 2 and w not in stop_words for w in words]
+    phrases = []
+    for i, word in enumerate(words):
+        if not keep[i]:
+            continue
+        phrases.append(word)
+        if i + 1 < len(words) and keep[i + 1]:
+            phrases.append(f"{word} {words[i + 1]}")
+    return phrases
+
+
+BACKENDS: Dict[str, Callable[[str, str], List[str]]] = {
+    'fast_np': _fast_np,
+    'regex': _regex,
+    'ngram': _ngram,
+}
+
+
+def _extract_chunk(backend: str, language: str, sentences: List[str]) -> List[List[str]]:
+    extract = BACKENDS[backend]
+    return [extract(sentence, language) for sentence in sentences]
+
+
+def _chunk(sentences: List[str]) -> List[List[str]]:
+    chunks, current, size = [], [], 0
+    for sentence in sentences:
+        current.append(sentence)
+        size += len(sentence)
+        if size >= CHUNK_CHARS:
+            chunks.append(current)
+            current, size = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _extract_sentences(sentences: List[str], backend: str, language: str, parallel: bool) -> List[List[str]]:
+    """
+    Phrases of each sentence. Sentences already in the shared sentence cache
+    are not extracted again; the rest are chunked, across the process pool
+    when there's enough text to be worth it.
+    """
+    field = f"np:{backend}:{language}"
+    results: List[Optional[List[str]]] = [sentence_cache.get(sentence, field) for sentence in sentences]
+    # Repeats within the batch (a footer on every page) are extracted once
+    missing = list(dict.fromkeys(sentences[i] for i, phrases in enumerate(results) if phrases is None))
+    if not missing:
+        return results
+
+    chunks = _chunk(missing)
+    if not parallel or MAX_WORKERS < 2 or len(chunks) < 2 or sum(map(len, missing)) < PARALLEL_MIN_CHARS:
+        extracted = [_extract_chunk(backend, language, chunk) for chunk in chunks]
+    else:
+        extracted = _get_pool().map(_extract_chunk, [backend] * len(chunks), [language] * len(chunks), chunks)
+
+    found = dict(zip(missing, (phrases for chunk in extracted for phrases in chunk)))
+    for sentence, phrases in found.items():
+        sentence_cache.set(sentence, field, phrases)
+    return [found[sentence] if phrases is None else phrases for sentence, phrases in zip(sentences, results)]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Forking a process with live threads (the web server, a crawl's
+        # fetchers) can copy held locks into the workers
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=context)
+    return _pool
+
+
+def extract_noun_phrases(text: str, backend: str = DEFAULT_BACKEND, parallel: bool = False,
+                         language: str = DEFAULT_LANGUAGE) -> List[str]:
+    """
+    Returns the lowercased noun phrases of text, in document order. Only
+    batch jobs should pass parallel=True to use the process pool.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown noun phrase backend: {backend}")
+    sentences = [text[start:end] for start, end in split_sentences(text)]
+    return [phrase for phrases in _extract_sentences(sentences, backend, language, parallel) for phrase in phrases]
+
+
+def extract_many(texts: Iterable[str], backend: str = DEFAULT_BACKEND,
+                 language: str = DEFAULT_LANGUAGE) -> List[List[str]]:
+    """
+    Batch version for training jobs: every chunk of every text shares one pool.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown noun phrase backend: {backend}")
+    owners, sentences = [], []
+    texts = list(texts)
+    for index, text in enumerate(texts):
+        for start, end in split_sentences(text):
+            owners.append(index)
+            sentences.append(text[start:end])
+
+    phrases: List[List[str]] = [[] for _ in texts]
+    for owner, sentence_phrases in zip(owners, _extract_sentences(sentences, backend, language, parallel=True)):
+        phrases[owner].extend(sentence_phrases)
+    return phrases
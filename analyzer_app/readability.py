@@ -0,0 +1,143 @@
+"""
+Readability scores computed from the shared tokenization (tokens.py).
+
+Syllables are estimated once per distinct word (a cached lookup in front of
+a vowel-group heuristic), then every per-sentence total is a single
+np.bincount over the word arrays. From those come Flesch Reading Ease,
+Flesch-Kincaid grade, Gunning Fog, the sentence-length distribution and the
+hardest sentences, in time linear in the length of the text.
+"""
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple
+
+import numpy as np
+
+from .tokens import Tokens, tokenize
+
+SYLLABLE_CACHE_SIZE = 100000
+# Sentences longer than this are flagged as hard to follow
+LONG_SENTENCE_WORDS = 30
+# Words of three or more syllables count as complex for Gunning Fog
+COMPLEX_SYLLABLES = 3
+WORST_SENTENCES = 5
+# Grade level most blog readers are comfortable with; each grade above costs points
+TARGET_GRADE = 8
+GRADE_PENALTY = 8
+# Upper bounds (inclusive) of the sentence-length buckets
+LENGTH_BUCKETS = [(10, "1-10"), (20, "11-20"), (30, "21-30")]
+
+VOWEL_GROUP_RE = re.compile(r'[aeiouy]+')
+# Common words the heuristic miscounts
+SYLLABLE_EXCEPTIONS = {
+    'area': 3, 'business': 2, 'every': 2, 'idea': 3, 'ideas': 3, 'people': 2,
+    'recipe': 3, 'recipes': 3, 'science': 2, 'something': 2, 'sometimes': 2,
+    'the': 1, 'video': 3, 'videos': 3, 'where': 1, 'there': 1, 'here': 1,
+}
+
+
+class Readability(NamedTuple):
+    words: int
+    sentences: int
+    syllables: int
+    complex_words: int
+    flesch_reading_ease: float
+    flesch_kincaid_grade: float
+    gunning_fog: float
+    score: int  # 0-100, from the grade level
+    long_sentences: int
+    sentence_lengths: Dict[str, Any]  # mean, median, p90, max and bucket counts
+    worst_sentences: List[Dict[str, Any]]  # {"start", "end", "words", "grade"}, hardest first
+
+
+@lru_cache(maxsize=SYLLABLE_CACHE_SIZE)
+def syllables(word: str) -> int:
+    """
+    Estimated syllable count of an English word (at least 1).
+    """
+    word = word.lower().replace("'", "")
+    if word in SYLLABLE_EXCEPTIONS:
+        return SYLLABLE_EXCEPTIONS[word]
+    count = len(VOWEL_GROUP_RE.findall(word))
+    if count > 1:
+        # Silent final e ("make", "whole") and -es/-ed that don't add a syllable
+        if word.endswith('e') and not word.endswith(('le', 'ee', 'ye')):
+            count -= 1
+        elif word.endswith(('es', 'ed')) and not word.endswith(
+                ('ted', 'ded', 'ces', 'ges', 'ses', 'zes', 'xes', 'ches', 'shes')):
+            count -= 1
+    return max(1, count)
+
+
+def _grade(words: np.ndarray, syllable_counts: np.ndarray) -> np.ndarray:
+    return 0.39 * words + 11.8 * syllable_counts / np.maximum(words, 1) - 15.59
+
+
+def _score(grade: float) -> int:
+    return int(max(0, min(100, round(100 - GRADE_PENALTY * max(0.0, grade - TARGET_GRADE)))))
+
+
+def analyze_readability(tokens: Tokens) -> Readability:
+    """
+    Readability of an already tokenized text (see tokens.tokenize).
+    """
+    n_sentences = len(tokens.sentences)
+    n_words = len(tokens.words)
+    if not n_words:
+        return Readability(0, n_sentences, 0, 0, 0.0, 0.0, 0.0, 0, 0, {}, [])
+
+    word_syllables = np.fromiter((syllables(w) for w in tokens.words), dtype=np.int64, count=n_words)
+    sentence_ids = np.asarray(tokens.sentence_ids, dtype=np.int64)
+    words_per_sentence = np.bincount(sentence_ids, minlength=n_sentences)
+    syllables_per_sentence = np.bincount(sentence_ids, weights=word_syllables, minlength=n_sentences)
+
+    total_syllables = int(word_syllables.sum())
+    complex_words = int(np.count_nonzero(word_syllables >= COMPLEX_SYLLABLES))
+    words_per_sentence_avg = n_words / n_sentences
+    syllables_per_word = total_syllables / n_words
+
+    grade = 0.39 * words_per_sentence_avg + 11.8 * syllables_per_word - 15.59
+    reading_ease = 206.835 - 1.015 * words_per_sentence_avg - 84.6 * syllables_per_word
+    fog = 0.4 * (words_per_sentence_avg + 100 * complex_words / n_words)
+
+    # Hardest sentences by their own grade level; argpartition keeps this linear
+    sentence_grades = _grade(words_per_sentence, syllables_per_sentence)
+    count = min(WORST_SENTENCES, n_sentences)
+    worst = np.argpartition(-sentence_grades, count - 1)[:count]
+    worst = worst[np.argsort(-sentence_grades[worst], kind='stable')]
+
+    edges = [upper for upper, _ in LENGTH_BUCKETS]
+    buckets = np.bincount(np.searchsorted(edges, words_per_sentence), minlength=len(edges) + 1)
+    labels = [label for _, label in LENGTH_BUCKETS] + [f"{edges[-1] + 1}+"]
+
+    return Readability(
+        words=n_words,
+        sentences=n_sentences,
+        syllables=total_syllables,
+        complex_words=complex_words,
+        flesch_reading_ease=round(reading_ease, 1),
+        flesch_kincaid_grade=round(grade, 1),
+        gunning_fog=round(fog, 1),
+        score=_score(grade),
+        long_sentences=int(np.count_nonzero(words_per_sentence > LONG_SENTENCE_WORDS)),
+        sentence_lengths={
+            'mean': round(words_per_sentence_avg, 1),
+            'median': float(np.median(words_per_sentence)),
+            'p90': float(np.percentile(words_per_sentence, 90)),
+            'max': int(words_per_sentence.max()),
+            'buckets': dict(zip(labels, buckets.tolist())),
+        },
+        worst_sentences=[
+            {
+                'start': tokens.sentences[index][0],
+                'end': tokens.sentences[index][1],
+                'words': int(words_per_sentence[index]),
+                'grade': round(float(sentence_grades[index]), 1),
+            }
+            for index in worst.tolist()
+        ],
+    )
+
+
+def readability(text: str) -> Readability:
+    return analyze_readability(tokenize(text))
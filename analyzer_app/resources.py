@@ -0,0 +1,195 @@
+"""
+Optional audit of the images and links a page references.
+
+Finds broken images, oversized hero images and dead links. Every distinct
+URL gets one HEAD request (or a one-byte ranged GET when the server won't
+answer HEAD properly) over a pooled session. Checks run concurrently, with
+a per-host limit so a page full of same-CDN images doesn't hammer it.
+Results (status, content length, content type) go into the Django cache for
+ANALYZER_RESOURCE_CACHE_SECONDS, so assets shared by a site's pages are
+checked once per audit, not once per page.
+
+Off by default; enable with ANALYZER_RESOURCE_AUDIT = True.
+"""
+import hashlib
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+import requests
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+from .logic import BROWSER_HEADERS
+
+MAX_RESOURCES = 80
+WORKERS = 16
+PER_HOST_LIMIT = 4
+TIMEOUT = 5
+# Failures may be transient, so they are re-checked sooner
+FAILURE_CACHE_SECONDS = 5 * 60
+LARGE_IMAGE_BYTES = 500 * 1024
+# Only the first images of a page are above the fold
+HERO_IMAGES = 2
+# Servers that refuse bots or rate-limit us say nothing about the resource
+UNVERIFIED_STATUSES = {401, 403, 429}
+# HEAD answers that mean "ask again with GET"
+HEAD_UNSUPPORTED_STATUSES = {400, 403, 405, 501}
+
+CONTENT_RANGE_TOTAL_RE = re.compile(r'/(\d+)\s*$')
+
+
+class ResourceCheck(NamedTuple):
+    url: str
+    status: int  # 0 when the request failed
+    content_length: Optional[int]
+    content_type: str
+    error: str
+
+    @property
+    def broken(self) -> bool:
+        return self.status == 0 or (self.status >= 400 and self.status not in UNVERIFIED_STATUSES)
+
+
+def audit_enabled() -> bool:
+    return getattr(settings, 'ANALYZER_RESOURCE_AUDIT', False)
+
+
+def collect_resources(soup: BeautifulSoup, base_url: str, limit: int = MAX_RESOURCES) -> List[Tuple[str, str]]:
+    """
+    Distinct absolute http(s) URLs of the page's images, then its links, as
+    (kind, url) pairs in page order, at most limit of them.
+    """
+    found = []
+    seen = set()
+    candidates = [('image', img.get('src')) for img in soup.find_all('img')]
+    candidates += [('link', a.get('href')) for a in soup.find_all('a', href=True)]
+    for kind, value in candidates:
+        if not value:
+            continue
+        parts = urlsplit(urljoin(base_url, value.strip()))
+        if parts.scheme not in ('http', 'https') or not parts.netloc:
+            continue
+        url = urlunsplit((parts.scheme, parts.netloc, parts.path, parts.query, ''))
+        # Links back to the page itself (table of contents anchors) aren't worth a request
+        if url in seen or (kind == 'link' and url == base_url.split('#')[0]):
+            continue
+        seen.add(url)
+        found.append((kind, url))
+        if len(found) >= limit:
+            break
+    return found
+
+
+@lru_cache(maxsize=1)
+def _session() -> requests.Session:
+    session = requests.Session()
+    session.headers.update(BROWSER_HEADERS)
+    adapter = HTTPAdapter(pool_connections=WORKERS, pool_maxsize=WORKERS)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_host_limits: Dict[str, threading.BoundedSemaphore] = {}
+_host_limits_lock = threading.Lock()
+
+
+def _host_limit(host: str) -> threading.BoundedSemaphore:
+    with _host_limits_lock:
+        semaphore = _host_limits.get(host)
+        if semaphore is None:
+            semaphore = _host_limits[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+        return semaphore
+
+
+def _cache_key(url: str) -> str:
+    return f"resource:{hashlib.sha1(url.encode('utf-8')).hexdigest()}"
+
+
+def _content_length(response: requests.Response) -> Optional[int]:
+    # A ranged GET reports the full size after the slash: "bytes 0-0/48213"
+    match = CONTENT_RANGE_TOTAL_RE.search(response.headers.get('Content-Range', ''))
+    if match:
+        return int(match.group(1))
+    value = response.headers.get('Content-Length', '')
+    if response.status_code != 206 and value.isdigit():
+        return int(value)
+    return None
+
+
+def _request(url: str) -> requests.Response:
+    session = _session()
+    response = session.head(url, allow_redirects=True, timeout=TIMEOUT)
+    if response.status_code in HEAD_UNSUPPORTED_STATUSES or (response.ok and 'Content-Length' not in response.headers):
+        response = session.get(url, headers={'Range': 'bytes=0-0'}, allow_redirects=True,
+                               timeout=TIMEOUT, stream=True)
+        response.close()  # only the headers are needed
+    return response
+
+
+def check_resource(url: str) -> ResourceCheck:
+    """
+    Status, size and type of url, from the cache when checked recently.
+    """
+    key = _cache_key(url)
+    cached = cache.get(key)
+    if cached is not None:
+        return ResourceCheck(*cached)
+
+    with _host_limit(urlsplit(url).netloc):
+        try:
+            response = _request(url)
+            check = ResourceCheck(
+                url, response.status_code, _content_length(response),
+                response.headers.get('Content-Type', '').split(';')[0].strip(), '',
+            )
+        except requests.RequestException as e:
+            check = ResourceCheck(url, 0, None, '', f"{type(e).__name__}: {e}"[:200])
+
+    timeout = FAILURE_CACHE_SECONDS if check.broken else getattr(settings, 'ANALYZER_RESOURCE_CACHE_SECONDS', 60 * 60)
+    cache.set(key, tuple(check), timeout)
+    return check
+
+
+def audit_resources(soup: BeautifulSoup, base_url: str) -> Dict[str, Any]:
+    """
+    Checks the page's images and links concurrently. Returns counts plus the
+    broken images, broken links and oversized images found.
+    """
+    resources = collect_resources(soup, base_url)
+    if not resources:
+        return {"checked": 0, "broken_images": [], "broken_links": [], "oversized_images": []}
+
+    with ThreadPoolExecutor(max_workers=min(WORKERS, len(resources))) as pool:
+        checks = list(pool.map(check_resource, [url for _, url in resources]))
+
+    broken_images, broken_links, oversized_images = [], [], []
+    # Position of each image on the page, whatever its status (images come first)
+    image_positions = {url: position for position, (kind, url) in enumerate(resources) if kind == 'image'}
+    for (kind, url), check in zip(resources, checks):
+        entry = {"url": url, "status": check.status, "error": check.error}
+        if kind == 'link':
+            if check.broken:
+                broken_links.append(entry)
+        elif check.broken:
+            broken_images.append(entry)
+        elif check.content_length and check.content_length > LARGE_IMAGE_BYTES:
+            oversized_images.append({
+                "url": url,
+                "bytes": check.content_length,
+                "content_type": check.content_type,
+                "hero": image_positions[url] < HERO_IMAGES,
+            })
+
+    return {
+        "checked": len(resources),
+        "broken_images": broken_images,
+        "broken_links": broken_links,
+        "oversized_images": oversized_images,
+    }
@@ -0,0 +1,334 @@
+import math
+import re
+import string
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .nlp_cache import SentenceCache, sentence_cache
+from .tokens import split_sentences
+
+UNKNOWN_ID = 0
+
+# (empirically derived VADER amplifiers for '!' and '?', and their caps)
+EXCLAMATION_INCR = 0.292
+MAX_EXCLAMATIONS = 4
+QUESTION_INCR = 0.18
+MAX_QUESTION_EMPHASIS = 0.96
+# Lexicon words below this valence are reported as candidates for rewording
+NEGATIVE_WORD_VALENCE = -0.5
+
+TOKEN_RE = re.compile(r'\S+')
+PUNCTUATION = set(string.punctuation)
+# Multiplier on a sentiment word after "never so" / "never this" ...
+NEVER_SO_SCALAR = 1.5
+# ... and after "never so X" or a bare "so" / "this"
+NEVER_SO_FAR_SCALAR = 1.25
+
+
+class SentimentResult(NamedTuple):
+    compound: float
+    sentences: List[Tuple[int, int]]  # (start, end) offsets into the text
+    sentence_scores: np.ndarray  # compound score of each sentence on its own
+    # Strongly negative lexicon words per sentence: (word, offset within sentence)
+    negative_words: List[List[Tuple[str, int]]]
+
+
+def _back(values: np.ndarray, distance: int, fill=0) -> np.ndarray:
+    """
+    values shifted right by distance: element i holds values[i - distance].
+    """
+    shifted = np.full_like(values, fill)
+    if distance < len(values):
+        shifted[distance:] = values[:len(values) - distance]
+    return shifted
+
+
+class SentimentEngine:
+    """
+    Array-backed re-implementation of VADER's scoring rules, scoring like
+    nltk's SentimentIntensityAnalyzer.polarity_scores.
+
+    The lexicon is mapped to integer ids once; a text is then tokenized the
+    way VADER does it (whitespace split, one leading or trailing punctuation
+    mark stripped, one-character tokens dropped) and scored with a handful of
+    NumPy passes: booster words and negations up to three tokens back, "never
+    so", "least", ALL CAPS emphasis, idioms, the first "but" and '!'/'?'
+    emphasis. VADER's quirks are kept, so the scores are the same: a repeated
+    word is scored in the context of its first occurrence, and the rules see
+    across sentence boundaries.
+
+    The document's compound score is one pass over the whole text. Each
+    sentence's own score (what polarity_scores would give for the sentence
+    alone) is memoized in the shared sentence cache.
+    """
+
+    def __init__(self, lexicon: Dict[str, float], constants):
+        self.constants = constants
+        self.vocab = {word: i + 1 for i, word in enumerate(lexicon)}
+        for word in list(constants.BOOSTER_DICT) + list(constants.NEGATE) + ['but', 'least', 'kind', 'of', 'at', 'this']:
+            self.vocab.setdefault(word, len(self.vocab) + 1)
+
+        size = len(self.vocab) + 1
+        self.valence = np.zeros(size, dtype=np.float64)
+        self.in_lexicon = np.zeros(size, dtype=bool)
+        self.booster = np.zeros(size, dtype=np.float64)
+        self.is_booster = np.zeros(size, dtype=bool)
+        self.negation = np.zeros(size, dtype=bool)
+
+        for word, measure in lexicon.items():
+            self.valence[self.vocab[word]] = measure
+            self.in_lexicon[self.vocab[word]] = True
+        for word, scalar in constants.BOOSTER_DICT.items():
+            self.booster[self.vocab[word]] = scalar
+            self.is_booster[self.vocab[word]] = True
+        for word in constants.NEGATE:
+            self.negation[self.vocab[word]] = True
+        self.but_id = self.vocab['but']
+        self.least_id = self.vocab['least']
+        self.kind_id = self.vocab['kind']
+        self.of_id = self.vocab['of']
+        self.at_very_ids = [self.vocab.get('at', -1), self.vocab.get('very', -1)]
+        self.idiom_words = {
+            word for phrase in list(constants.SPECIAL_CASE_IDIOMS) + list(constants.BOOSTER_DICT)
+            if ' ' in phrase for word in phrase.split()
+        }
+
+    def lookup(self, words: List[str]) -> np.ndarray:
+        vocab = self.vocab
+        return np.fromiter((vocab.get(w, UNKNOWN_ID) for w in words), dtype=np.int64, count=len(words))
+
+    def _exact(self, words: List[str], ids: np.ndarray, *spellings: str) -> np.ndarray:
+        """
+        Tokens spelled exactly (case included) like one of spellings.
+        """
+        found = np.zeros(len(words), dtype=bool)
+        candidates = np.flatnonzero(np.isin(ids, [self.vocab[spelling] for spelling in spellings]))
+        found[candidates] = [words[i] in spellings for i in candidates.tolist()]
+        return found
+
+    def tokens(self, text: str, start: int = 0, end: Optional[int] = None) -> Tuple[List[str], List[int]]:
+        """
+        VADER's tokens of text[start:end] and their offsets: whitespace-split,
+        without one-character tokens, and with a single leading or trailing
+        punctuation mark (from VADER's list) removed from otherwise clean words.
+        """
+        punc_list = self.constants.PUNC_LIST
+        words, offsets = [], []
+        for match in TOKEN_RE.finditer(text, start, len(text) if end is None else end):
+            token = match.group()
+            if len(token) < 2:
+                continue
+            offset = match.start()
+            if token[-1] in PUNCTUATION or token[0] in PUNCTUATION:
+                for punc in punc_list:
+                    if token.endswith(punc) and _clean_word(token[:-len(punc)]):
+                        token = token[:-len(punc)]
+                        break
+                else:
+                    for punc in punc_list:
+                        if token.startswith(punc) and _clean_word(token[len(punc):]):
+                            token, offset = token[len(punc):], offset + len(punc)
+                            break
+            words.append(token)
+            offsets.append(offset)
+        return words, offsets
+
+    def _valences(self, words: List[str], groups: np.ndarray, n_groups: int) -> np.ndarray:
+        """
+        VADER's per-token sentiments after the "but" rule, with every group
+        (a whole document, or one sentence each) scored as a separate text.
+        """
+        n = len(words)
+        if not n:
+            return np.zeros(0)
+        c = self.constants
+        lowered = [w.lower() for w in words]
+        ids = self.lookup(lowered)
+        lower_in_lexicon = self.in_lexicon[ids]
+        group_start = np.zeros(n_groups, dtype=np.int64)
+        firsts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        group_start[groups[firsts]] = firsts
+        position = np.arange(n) - group_start[groups]
+        next_same = np.r_[groups[1:] == groups[:-1], False]
+
+        upper = np.fromiter((w.isupper() for w in words), dtype=bool, count=n)
+        all_upper = np.bincount(groups, weights=upper, minlength=n_groups)
+        group_sizes = np.bincount(groups, minlength=n_groups)
+        # Caps emphasis only counts when some, but not all, tokens are ALL CAPS
+        cap_diff = ((all_upper > 0) & (all_upper < group_sizes))[groups]
+        negated = self.negation[ids].copy()
+        negated[[i for i, w in enumerate(lowered) if "n't" in w]] = True
+        never = self._exact(words, ids, 'never')
+        so_this = self._exact(words, ids, 'so', 'this')
+
+        kind_of = (ids == self.kind_id) & np.r_[ids[1:] == self.of_id, False] & next_same
+        scored = lower_in_lexicon & ~self.is_booster[ids] & ~kind_of
+        valences = np.where(scored, self.valence[ids], 0.0)
+        valences += np.where(scored & upper & cap_diff, np.where(valences > 0, c.C_INCR, -c.C_INCR), 0.0)
+
+        for distance, damp in ((1, 1.0), (2, 0.95), (3, 0.9)):
+            window = scored & (position >= distance) & ~_back(lower_in_lexicon, distance)
+            prev_ids = _back(ids, distance)
+            boost = np.where(valences < 0, -self.booster[prev_ids], self.booster[prev_ids])
+            caps_boost = self.is_booster[prev_ids] & _back(upper, distance) & cap_diff
+            boost += np.where(caps_boost, np.where(valences > 0, c.C_INCR, -c.C_INCR), 0.0)
+            valences = np.where(window, valences + boost * damp, valences)
+
+            prev_negated = window & _back(negated, distance)
+            if distance == 1:
+                valences = np.where(prev_negated, valences * c.N_SCALAR, valences)
+            elif distance == 2:
+                never_so = window & _back(never, 2) & _back(so_this, 1)
+                valences = np.where(never_so, valences * NEVER_SO_SCALAR,
+                                    np.where(prev_negated, valences * c.N_SCALAR, valences))
+            else:
+                never_so = window & ((_back(never, 3) & _back(so_this, 2)) | _back(so_this, 1))
+                valences = np.where(never_so, valences * NEVER_SO_FAR_SCALAR,
+                                    np.where(prev_negated, valences * c.N_SCALAR, valences))
+                self._idioms(valences, words, window, groups)
+
+        # "least" negates what follows, except in "at least" / "very least"
+        after_least = scored & (position >= 1) & (_back(ids, 1) == self.least_id) & ~self.in_lexicon[self.least_id]
+        at_very = np.isin(_back(ids, 2), self.at_very_ids) & (position >= 2)
+        valences = np.where(after_least & ~at_very, valences * c.N_SCALAR, valences)
+
+        # VADER looks words up by value, so a repeated word takes its first occurrence's score
+        # (only lexicon words matter: every other token is 0 wherever it occurs)
+        group_list = groups.tolist()
+        seen: Dict[Tuple[int, str], int] = {}
+        lexicon_at = np.flatnonzero(lower_in_lexicon).tolist()
+        for index in lexicon_at:
+            seen.setdefault((group_list[index], words[index]), index)
+        valences[lexicon_at] = valences[[seen[(group_list[i], words[i])] for i in lexicon_at]]
+
+        # The first "but" of each group dampens what comes before it and boosts what follows
+        but_positions = np.flatnonzero(ids == self.but_id)
+        if len(but_positions):
+            first_groups, first_index = np.unique(groups[but_positions], return_index=True)
+            but_at = np.full(n_groups, -1, dtype=np.int64)
+            but_at[first_groups] = but_positions[first_index]
+            pivot = but_at[groups]
+            index = np.arange(n)
+            valences *= np.where(pivot < 0, 1.0, np.where(index < pivot, 0.5, np.where(index > pivot, 1.5, 1.0)))
+        return valences
+
+    def _idioms(self, valences: np.ndarray, words: List[str], window: np.ndarray, groups: np.ndarray) -> None:
+        """
+        VADER's idiom check ("the bomb", "kiss of death", "sort of ..."), in place.
+        Only tokens near an idiom word are looked at.
+        """
+        c = self.constants
+        idioms = c.SPECIAL_CASE_IDIOMS
+        near = np.fromiter((w in self.idiom_words for w in words), dtype=bool, count=len(words))
+        near = near | _back(near, 1) | _back(near, 2) | _back(near, 3)
+        near = near | np.r_[near[1:], False] | np.r_[near[2:], False, False]
+        for i in np.flatnonzero(window & near).tolist():
+            w = words
+            sequences = [
+                f"{w[i - 1]} {w[i]}", f"{w[i - 2]} {w[i - 1]} {w[i]}", f"{w[i - 2]} {w[i - 1]}",
+                f"{w[i - 3]} {w[i - 2]} {w[i - 1]}", f"{w[i - 3]} {w[i - 2]}",
+            ]
+            for sequence in sequences:
+                if sequence in idioms:
+                    valences[i] = idioms[sequence]
+                    break
+            if i + 1 < len(w) and groups[i + 1] == groups[i] and f"{w[i]} {w[i + 1]}" in idioms:
+                valences[i] = idioms[f"{w[i]} {w[i + 1]}"]
+            if i + 2 < len(w) and groups[i + 2] == groups[i] and f"{w[i]} {w[i + 1]} {w[i + 2]}" in idioms:
+                valences[i] = idioms[f"{w[i]} {w[i + 1]} {w[i + 2]}"]
+            if sequences[4] in c.BOOSTER_DICT or sequences[2] in c.BOOSTER_DICT:
+                valences[i] += c.B_DECR
+
+    def score(self, text: str, cache: Optional[SentenceCache] = sentence_cache) -> SentimentResult:
+        spans = split_sentences(text)
+        n_sentences = len(spans)
+        field = "sentiment"
+
+        scores = np.zeros(n_sentences)
+        negative_words: List[List[Tuple[str, int]]] = [[] for _ in spans]
+        missing = []
+        repeats: Dict[str, int] = {}
+        for index, (start, end) in enumerate(spans):
+            sentence = text[start:end]
+            cached = cache.get(sentence, field) if cache is not None else None
+            if cached is not None:
+                scores[index], negative_words[index] = cached
+            elif sentence in repeats:
+                continue
+            else:
+                repeats[sentence] = index
+                missing.append(index)
+
+        if missing:
+            # Score only the sentences not seen before, each as its own text, in one vectorized pass
+            words, offsets, sentence_ids = [], [], []
+            for local_index, index in enumerate(missing):
+                start, end = spans[index]
+                sentence_words, sentence_offsets = self.tokens(text, start, end)
+                words += sentence_words
+                offsets += [offset - start for offset in sentence_offsets]
+                sentence_ids += [local_index] * len(sentence_words)
+            local_ids = np.asarray(sentence_ids, dtype=np.int64)
+            sums = np.bincount(local_ids, weights=self._valences(words, local_ids, len(missing)),
+                               minlength=len(missing))
+            ids = self.lookup([w.lower() for w in words])
+            for position in np.flatnonzero(self.in_lexicon[ids] & (self.valence[ids] < NEGATIVE_WORD_VALENCE)):
+                negative_words[missing[sentence_ids[position]]].append((words[position], offsets[position]))
+            for local_index, index in enumerate(missing):
+                start, end = spans[index]
+                scores[index] = _compound(float(sums[local_index]), text[start:end])
+                if cache is not None:
+                    cache.set(text[start:end], field, (float(scores[index]), negative_words[index]))
+
+            # Sentences repeated within the text reuse the first occurrence's result
+            for index, (start, end) in enumerate(spans):
+                first = repeats.get(text[start:end], index)
+                if first != index:
+                    scores[index], negative_words[index] = scores[first], list(negative_words[first])
+
+        words, _ = self.tokens(text)
+        total = float(self._valences(words, np.zeros(len(words), dtype=np.int64), 1).sum())
+        return SentimentResult(round(_compound(total, text), 4), spans, scores, negative_words)
+
+
+def _clean_word(word: str) -> bool:
+    return len(word) > 1 and not any(ch in PUNCTUATION for ch in word)
+
+
+def _punctuation_emphasis(text: str) -> float:
+    emphasis = min(text.count('!'), MAX_EXCLAMATIONS) * EXCLAMATION_INCR
+    questions = text.count('?')
+    if questions > 3:
+        emphasis += MAX_QUESTION_EMPHASIS
+    elif questions > 1:
+        emphasis += questions * QUESTION_INCR
+    return emphasis
+
+
+def _compound(total: float, text: str) -> float:
+    """
+    VADER's compound score of a text from its summed token sentiments.
+    """
+    if total:
+        total += math.copysign(_punctuation_emphasis(text), total)
+    return float(_normalize(np.array([total]))[0])
+
+
+def _normalize(scores: np.ndarray, alpha: float = 15) -> np.ndarray:
+    """
+    Squashes raw valence sums into -1..1 the same way VADER's compound score does.
+    """
+    return scores / np.sqrt(scores * scores + alpha)
+
+
+@lru_cache(maxsize=1)
+def get_sentiment_engine() -> SentimentEngine:
+    """
+    Builds the engine from NLTK's VADER lexicon once per process.
+    """
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+    sia = SentimentIntensityAnalyzer()
+    return SentimentEngine(sia.lexicon, sia.constants)
@@ -0,0 +1,172 @@
+import hashlib
+import json
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .benchmarks import benchmark
+from .fingerprint import bands, content_hash, hamming_distance, shingles, simhash, to_signed, to_unsigned, MAX_DISTANCE, MIN_SHINGLES
+from .leaderboard import record_analysis
+from .logic import ParsedPage, analyze_page, normalize_url, parse_page
+from .models import Analysis, Fingerprint
+from .resources import audit_enabled
+
+# Seconds a result payload stays in the cache in front of the Analysis table
+RESULT_CACHE_TIMEOUT = 60 * 60
+SESSION_KEY = 'analyses'
+
+
+def _cache_key(analysis_id: int) -> str:
+    return f'analysis:{analysis_id}'
+
+
+def result_hash(data: Dict[str, Any]) -> str:
+    """
+    Stable content hash of a result payload (key order independent).
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def save_analysis(url: str, data: Dict[str, Any], fingerprint: Optional[int] = None, digest: str = '',
+                  etag: str = '', last_modified: str = '') -> int:
+    """
+    Persists an analysis result, updates the page's leaderboard standings
+    and returns the new id.
+    """
+    with transaction.atomic():
+        analysis = Analysis.objects.create(
+            url=url, host=urlsplit(url).netloc.lower(), result=data, result_hash=result_hash(data),
+            etag=etag, last_modified=last_modified,
+        )
+        if fingerprint is not None:
+            band_values = bands(fingerprint)
+            Fingerprint.objects.create(
+                analysis=analysis, simhash=to_signed(fingerprint), content_hash=digest,
+                **{f'band{i}': value for i, value in enumerate(band_values)},
+            )
+        record_analysis(url, data, when=analysis.created_at)
+    cache.set(_cache_key(analysis.pk), data, RESULT_CACHE_TIMEOUT)
+    return analysis.pk
+
+
+def find_near_duplicate(fingerprint: int, url: str = "", digest: str = "") -> Optional[int]:
+    """
+    Returns the id of a recent analysis of a near-identical page served under
+    a different URL of the same site, or of a page with exactly the same text
+    (digest) on any site. Analyses of url itself are never returned, so
+    analyzing the same page again always reflects its latest edits.
+    """
+    if not fingerprint:
+        return None
+    max_age = timedelta(days=getattr(settings, 'ANALYZER_DUPLICATE_MAX_AGE_DAYS', 7))
+    band_match = Q()
+    for i, value in enumerate(bands(fingerprint)):
+        band_match |= Q(**{f'band{i}': value})
+    candidates = (
+        Fingerprint.objects.filter(band_match, analysis__created_at__gte=timezone.now() - max_age)
+        .order_by('-analysis__created_at')
+        .values_list('analysis_id', 'simhash', 'analysis__url', 'analysis__host', 'content_hash')[:50]
+    )
+    normalized = normalize_url(url) if url else None
+    host = urlsplit(url).netloc.lower()
+    for analysis_id, stored, stored_url, stored_host, stored_digest in candidates:
+        if hamming_distance(fingerprint, to_unsigned(stored)) > MAX_DISTANCE:
+            continue
+        if normalized and normalize_url(stored_url) == normalized:
+            continue
+        if stored_host != host and not (digest and stored_digest == digest):
+            continue
+        return analysis_id
+    return None
+
+
+def analyze_and_save(url: str, html: str, fingerprint: Optional[int] = None, parsed: Optional[ParsedPage] = None,
+                     etag: str = '', last_modified: str = '', parallel: bool = False) -> Tuple[int, Dict[str, Any]]:
+    """
+    Analyzes html fetched from url and stores the result, ranked against its
+    topic's benchmarks, unless a near duplicate of the page was analyzed
+    recently, in which case that analysis is reused. Pass the parse_page()
+    result when the caller already has it, and the fetch's ETag /
+    Last-Modified so monitoring can start from them. parallel is passed to
+    analyze_page(). Returns (analysis_id, result).
+    """
+    if parsed is None:
+        parsed = parse_page(html)
+    text = parsed.text
+    if fingerprint is None:
+        fingerprint = simhash(text)
+    digest = content_hash(text)
+    # Near-empty extractions all look alike; never reuse an analysis for them
+    if fingerprint and len(shingles(text)) >= MIN_SHINGLES:
+        duplicate_id = find_near_duplicate(fingerprint, url, digest)
+        if duplicate_id is not None:
+            data = load_analysis(duplicate_id)
+            if data is not None:
+                return duplicate_id, data
+
+    data = analyze_page(html, url=url, resource_audit=audit_enabled(), parsed=parsed,
+                        parallel=parallel)
+    with transaction.atomic():
+        data['benchmark'] = benchmark(data)
+        analysis_id = save_analysis(url, data, fingerprint=fingerprint, digest=digest,
+                                    etag=etag, last_modified=last_modified)
+        return analysis_id, data
+
+
+def load_analysis(analysis_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Returns the stored result for analysis_id, or None if it no longer exists.
+    """
+    data = cache.get(_cache_key(analysis_id))
+    if data is None:
+        data = Analysis.objects.filter(pk=analysis_id).values_list('result', flat=True).first()
+        if data is not None:
+            cache.set(_cache_key(analysis_id), data, RESULT_CACHE_TIMEOUT)
+    return data
+
+
+def recall_analysis(session, url: str) -> Optional[int]:
+    """
+    Returns the analysis id this session already has for url, if any.
+    """
+    for remembered_url, analysis_id in session.get(SESSION_KEY, []):
+        if remembered_url == url:
+            return analysis_id
+    return None
+
+
+def recall_url(session, analysis_id: int) -> Optional[str]:
+    """
+    Returns the URL this session analyzed as analysis_id, if it did.
+    """
+    for remembered_url, remembered_id in session.get(SESSION_KEY, []):
+        if remembered_id == analysis_id:
+            return remembered_url
+    return None
+
+
+def remember_analysis(session, url: str, analysis_id: int) -> None:
+    """
+    Records url -> analysis_id in the session, most recent first.
+    Only the newest ANALYZER_SESSION_MAX_URLS entries are kept so the
+    session row stays small no matter how many URLs a visitor analyzes.
+    """
+    max_urls = getattr(settings, 'ANALYZER_SESSION_MAX_URLS', 10)
+    entries = session.get(SESSION_KEY, [])
+    updated = [[url, analysis_id]] + [entry for entry in entries if entry[0] != url]
+    updated = updated[:max_urls]
+
+    # Drop full payloads written by older versions of the analyze view
+    legacy_keys = [key for key in session.keys() if key.startswith('analysis_data_')]
+    for key in legacy_keys:
+        del session[key]
+
+    if updated != entries:
+        session[SESSION_KEY] = updated
@@ -0,0 +1,128 @@
+import gzip
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from analyzer_app.api import negotiate_encoding
+from analyzer_app.models import Analysis
+from analyzer_app.store import result_hash
+
+RESULT = {
+    "overall_score": 72,
+    "topic": "Food",
+    "summary": "A long enough summary to be worth compressing. " * 10,
+    "categories": {
+        "content": {"score": 80, "metrics": [{"name": "Grammar", "value": 90}]},
+        "ux": {"score": 60, "metrics": [{"name": "Navigation", "value": 61}]},
+    },
+    "recommendations": [
+        {"priority": "HIGH", "title": f"Fix {i}", "desc": "d", "ai_fix": f"fix {i}"} for i in range(5)
+    ],
+}
+
+
+class NegotiateEncodingTests(TestCase):
+    def test_qvalues(self):
+        self.assertEqual(negotiate_encoding('gzip, deflate'), 'gzip')
+        self.assertIsNone(negotiate_encoding(''))
+        self.assertIsNone(negotiate_encoding('gzip;q=0'))
+        self.assertIsNone(negotiate_encoding('gzip;q=0, identity'))
+        self.assertEqual(negotiate_encoding('*'), negotiate_encoding('br, gzip'))
+        self.assertIsNone(negotiate_encoding('*;q=0'))
+        self.assertEqual(negotiate_encoding('br;q=0, gzip;q=0.5'), 'gzip')
+
+
+class AnalysisDetailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.analysis = Analysis.objects.create(
+            url="https://blog.example/post", host="blog.example", result=RESULT, result_hash=result_hash(RESULT),
+        )
+        self.url = f'/api/v1/analyses/{self.analysis.pk}/'
+
+    def set_premium(self):
+        session = self.client.session
+        session['is_premium'] = True
+        session.save()
+
+    def test_free_result_is_trimmed(self):
+        data = self.client.get(self.url).json()['result']
+        self.assertTrue(data['categories']['ux']['locked'])
+        self.assertIsNone(data['categories']['ux']['score'])
+        self.assertEqual(sum('ai_fix' in rec for rec in data['recommendations']), 3)
+
+    def test_premium_gets_full_result_and_its_own_etag(self):
+        free_etag = self.client.get(self.url)['ETag']
+        self.set_premium()
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['result']['categories']['ux']['score'], 60)
+        self.assertNotEqual(response['ETag'], free_etag)
+        # The free tag doesn't validate the premium representation
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=free_etag).status_code, 200)
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_changed_result_gets_a_new_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        changed = {**RESULT, "overall_score": 73}
+        Analysis.objects.filter(pk=self.analysis.pk).update(result=changed, result_hash=result_hash(changed))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_gzip_has_its_own_etag(self):
+        plain = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], plain['ETag'][:-1] + '-gz"')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        not_modified = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+    def test_gzip_etag_does_not_validate_other_representations(self):
+        gz_etag = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=gz_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Encoding', response)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=gz_etag, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertEqual(response.status_code, 200)
+
+    def test_refused_gzip_is_not_used(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_missing_analysis_is_404(self):
+        self.assertEqual(self.client.get('/api/v1/analyses/999999/').status_code, 404)
+
+
+class SiteHistoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for score in (50, 60):
+            result = {**RESULT, "overall_score": score}
+            Analysis.objects.create(url="https://blog.example/post", host="blog.example",
+                                    result=result, result_hash=result_hash(result))
+
+    def test_history_and_304(self):
+        response = self.client.get('/api/v1/sites/Blog.Example/analyses/')
+        data = response.json()
+        self.assertEqual(data['host'], 'blog.example')
+        self.assertEqual([a['result']['overall_score'] for a in data['analyses']], [60, 50])
+        again = self.client.get('/api/v1/sites/blog.example/analyses/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_new_analysis_changes_the_etag(self):
+        etag = self.client.get('/api/v1/sites/blog.example/analyses/')['ETag']
+        Analysis.objects.create(url="https://blog.example/other", host="blog.example",
+                                result=RESULT, result_hash=result_hash(RESULT))
+        response = self.client.get('/api/v1/sites/blog.example/analyses/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['analyses']), 3)
@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from analyzer_app import benchmarks
+from analyzer_app.benchmarks import benchmark, category_scores, percentile_rank, rebuild_histograms, record_scores
+from analyzer_app.models import Analysis, ScoreHistogram
+
+REFERENCES = {"Food": {"url": "https://reference.example/", "scores": {"overall": 80, "content": 90}}}
+
+
+def _histogram(scores):
+    counts = [0] * 101
+    for score in scores:
+        counts[score] += 1
+    return counts
+
+
+class PercentileRankTests(SimpleTestCase):
+    def test_ties_count_half(self):
+        counts = _histogram([10, 20, 20, 30])
+        self.assertEqual(percentile_rank(counts, 20), 50)
+        self.assertEqual(percentile_rank(counts, 25), 75)
+        self.assertEqual(percentile_rank(counts, 30), 88)
+        self.assertEqual(percentile_rank(counts, 0), 0)
+        self.assertEqual(percentile_rank(counts, 100), 100)
+
+    def test_empty_histogram(self):
+        self.assertIsNone(percentile_rank([0] * 101, 50))
+
+    def test_category_scores_are_clamped(self):
+        data = {
+            "overall_score": 104.6,
+            "categories": {"content": {"score": -3}, "ux": {"score": "n/a"}, "unknown": {"score": 50}},
+        }
+        self.assertEqual(category_scores(data), {"overall": 100, "content": 0})
+
+
+class RecordScoresTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(benchmarks, 'reference_sites', return_value=REFERENCES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_new_histograms_are_seeded_with_the_reference(self):
+        ranks, sample_size = record_scores("Food", {"overall": 80, "content": 50})
+        self.assertEqual(ranks, {"overall": 50, "content": 0})
+        self.assertEqual(sample_size, 1)
+        histogram = ScoreHistogram.objects.get(topic="Food", category="overall")
+        self.assertEqual(histogram.total, 2)
+        self.assertEqual(histogram.counts[80], 2)
+
+    def test_ranks_before_counting(self):
+        ranks, sample_size = record_scores("Music", {"overall": 70})
+        self.assertEqual((ranks, sample_size), ({"overall": None}, 0))
+        for score in (40, 60, 80):
+            record_scores("Music", {"overall": score})
+        ranks, sample_size = record_scores("Music", {"overall": 65})
+        self.assertEqual(sample_size, 4)
+        self.assertEqual(ranks["overall"], 50)
+
+    def test_benchmark_block(self):
+        result = benchmark({"topic": "Food", "overall_score": 90, "categories": {}})
+        self.assertEqual(result["topic"], "Food")
+        self.assertEqual(result["percentiles"], {"overall": 100})
+        self.assertEqual(result["reference"]["url"], "https://reference.example/")
+        self.assertIsNone(benchmark({"overall_score": 90})["reference"])
+
+    def test_rebuild_matches_incremental_updates(self):
+        results = [
+            {"topic": "Food", "overall_score": score, "categories": {"content": {"score": score - 5}}}
+            for score in (55, 70, 70, 95)
+        ]
+        for data in results:
+            benchmark(data)
+            Analysis.objects.create(url="https://a.example/", host="a.example", result=data)
+        incremental = {(h.topic, h.category): h.counts for h in ScoreHistogram.objects.all()}
+
+        self.assertEqual(rebuild_histograms(), 4)
+        rebuilt = {(h.topic, h.category): h.counts for h in ScoreHistogram.objects.all()}
+        self.assertEqual(rebuilt, incremental)
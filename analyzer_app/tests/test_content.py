@@ -0,0 +1,62 @@
+from bs4 import BeautifulSoup
+from django.test import SimpleTestCase
+
+from analyzer_app.content import extract_main_content
+from analyzer_app.logic import parse_page
+
+PARAGRAPHS = "".join(
+    f"<p>Step {i}: season the vegetables, roast them slowly, and let the flavours develop over time.</p>"
+    for i in range(6)
+)
+PAGE = f"""
+<html><body>
+  <header class="site-header"><a href="/">Home</a> <a href="/about">About</a></header>
+  <nav><a href="/a">Recipes</a> <a href="/b">Guides</a> <a href="/c">Shop</a></nav>
+  <div class="content-sidebar-wrap">
+    <article class="post"><h1>Roasting Vegetables</h1>{PARAGRAPHS}</article>
+    <aside class="sidebar"><p>Subscribe to our newsletter for weekly recipes and exclusive offers.</p></aside>
+  </div>
+  <div id="comments"><p>Great recipe, I tried it last night and my family loved every single bite.</p></div>
+  <div class="cookie-banner"><p>We use cookies to improve your experience on this website, accept them.</p></div>
+  <footer><p>Copyright 2024 Example Kitchen, all rights reserved worldwide, forever.</p></footer>
+</body></html>
+"""
+
+
+class ExtractMainContentTests(SimpleTestCase):
+    def test_keeps_article_drops_boilerplate(self):
+        text = extract_main_content(BeautifulSoup(PAGE, 'html.parser'))
+        self.assertIn("Roasting Vegetables", text)
+        self.assertIn("Step 5: season", text)
+        for boilerplate in ("Recipes", "newsletter", "my family", "cookies", "Copyright", "About"):
+            self.assertNotIn(boilerplate, text)
+
+    def test_block_boundaries_separate_words(self):
+        text = extract_main_content(BeautifulSoup(PAGE, 'html.parser'))
+        self.assertNotIn("VegetablesStep", text)
+
+    def test_soup_is_not_modified(self):
+        soup = BeautifulSoup(PAGE, 'html.parser')
+        before = str(soup)
+        extract_main_content(soup)
+        self.assertEqual(str(soup), before)
+
+    def test_link_heavy_block_loses(self):
+        links = "".join(f"<li><a href='/t{i}'>Tag number {i} about cooking dinner tonight</a></li>" for i in range(20))
+        html = f"<html><body><ul class='tags'>{links}</ul><div class='entry'>{PARAGRAPHS}</div></body></html>"
+        text = extract_main_content(BeautifulSoup(html, 'html.parser'))
+        self.assertIn("Step 0", text)
+        self.assertNotIn("Tag number", text)
+
+    def test_short_pages_fall_back_to_whole_text(self):
+        html = "<html><body><nav>Menu</nav><p>Short note.</p></body></html>"
+        text = extract_main_content(BeautifulSoup(html, 'html.parser'))
+        self.assertIn("Menu", text)
+        self.assertIn("Short note.", text)
+
+    def test_parse_page_drops_scripts_and_comments(self):
+        html = f"<html><body><script>var tracking = 1;</script><!-- hidden --><article>{PARAGRAPHS}</article></body></html>"
+        parsed = parse_page(html)
+        self.assertNotIn("tracking", parsed.text)
+        self.assertNotIn("hidden", parsed.text)
+        self.assertIsNone(parsed.soup.find('script'))
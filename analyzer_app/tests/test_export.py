@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+
+from django.test import SimpleTestCase, TestCase
+
+from analyzer_app.export import csv_fields, export_lines, flatten_categories
+from analyzer_app.models import Analysis
+from analyzer_app.views import FREE_RECOMMENDATIONS, result_for_tier
+
+RESULT = {
+    "overall_score": 72,
+    "topic": "Food",
+    "author": "Jane Doe",
+    "categories": {
+        "content": {"score": 80, "metrics": [{"name": "Grammar", "value": 90}, {"name": "Readability", "value": 70}]},
+        "ux": {"score": 60, "metrics": [{"name": "Navigation", "value": 61}]},
+    },
+    "recommendations": [
+        {"priority": "HIGH", "title": f"Fix {i}", "desc": "Needs work, really", "ai_fix": f"fix {i}"} for i in range(5)
+    ],
+}
+
+
+class ResultForTierTests(SimpleTestCase):
+    def test_premium_sees_everything(self):
+        self.assertIs(result_for_tier(RESULT, True), RESULT)
+
+    def test_free_tier_is_trimmed(self):
+        data = result_for_tier(RESULT, False)
+        self.assertEqual(data["categories"]["ux"], {"score": None, "metrics": [], "locked": True})
+        self.assertEqual(data["categories"]["content"], RESULT["categories"]["content"])
+        recommendations = data["recommendations"]
+        self.assertTrue(all("ai_fix" in rec for rec in recommendations[:FREE_RECOMMENDATIONS]))
+        self.assertTrue(all("ai_fix" not in rec and rec["locked"] for rec in recommendations[FREE_RECOMMENDATIONS:]))
+        # The stored payload is left alone
+        self.assertIn("ai_fix", RESULT["recommendations"][-1])
+
+
+class FlattenTests(SimpleTestCase):
+    def test_flatten_categories(self):
+        self.assertEqual(
+            flatten_categories(RESULT["categories"]),
+            {"content_score": 80, "content_grammar": 90, "content_readability": 70,
+             "ux_score": 60, "ux_navigation": 61},
+        )
+
+    def test_csv_fields_are_fixed(self):
+        fields = csv_fields(flatten=True)
+        self.assertIn("topic_fit_practicality", fields)
+        self.assertIn("visual_mobile_response", fields)
+        self.assertEqual(csv_fields()[-1], "result")
+        self.assertEqual(csv_fields("recommendations")[-1], "ai_fix")
+
+
+class ExportLinesTests(TestCase):
+    def setUp(self):
+        for path in ("first", "second"):
+            Analysis.objects.create(url=f"https://blog.example/{path}", host="blog.example", result=RESULT)
+        Analysis.objects.create(url="https://other.example/", host="other.example", result=RESULT)
+        self.analyses = Analysis.objects.filter(host="blog.example")
+
+    def _csv(self, **options):
+        return list(csv.DictReader(io.StringIO("".join(export_lines(self.analyses, fmt='csv', **options)))))
+
+    def test_csv_nests_the_result(self):
+        rows = self._csv()
+        self.assertEqual([row["url"] for row in rows], ["https://blog.example/first", "https://blog.example/second"])
+        self.assertEqual(json.loads(rows[0]["result"]), RESULT)
+
+    def test_flat_csv_has_empty_cells_for_missing_metrics(self):
+        row = self._csv(flatten=True)[0]
+        self.assertEqual((row["content_grammar"], row["ux_navigation"]), ("90", "61"))
+        self.assertEqual(row["engagement_ctas"], "")
+        self.assertNotIn("result", row)
+
+    def test_free_csv_is_trimmed(self):
+        row = self._csv(flatten=True, is_premium=False)[0]
+        self.assertEqual((row["ux_score"], row["ux_navigation"]), ("", ""))
+        self.assertEqual(row["content_score"], "80")
+
+    def test_recommendation_rows(self):
+        rows = self._csv(rows='recommendations', is_premium=False)
+        self.assertEqual(len(rows), 10)
+        self.assertEqual([row["ai_fix"] for row in rows[:5]], ["fix 0", "fix 1", "fix 2", "", ""])
+        self.assertEqual(rows[0]["desc"], "Needs work, really")
+
+    def test_jsonl(self):
+        lines = list(export_lines(self.analyses, fmt='jsonl', rows='recommendations'))
+        self.assertEqual(len(lines), 10)
+        self.assertTrue(all(line.endswith("\n") for line in lines))
+        self.assertEqual(json.loads(lines[4])["ai_fix"], "fix 4")
+
+
+class SiteExportViewTests(TestCase):
+    def setUp(self):
+        Analysis.objects.create(url="https://blog.example/post", host="blog.example", result=RESULT)
+
+    def test_streams_a_download(self):
+        response = self.client.get('/api/v1/sites/Blog.Example/export/', {'format': 'jsonl'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="blog.example-analyses.jsonl"')
+        record = json.loads(b"".join(response.streaming_content))
+        self.assertTrue(record["result"]["categories"]["ux"]["locked"])
+
+    def test_premium_export(self):
+        session = self.client.session
+        session['is_premium'] = True
+        session.save()
+        response = self.client.get('/api/v1/sites/blog.example/export/', {'format': 'jsonl'})
+        record = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(record["result"], RESULT)
+
+    def test_rejects_unknown_options(self):
+        self.assertEqual(self.client.get('/api/v1/sites/blog.example/export/', {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/sites/blog.example/export/', {'rows': 'pages'}).status_code, 400)
@@ -0,0 +1,109 @@
+import random
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from analyzer_app.fingerprint import (
+    BAND_BITS, BANDS, MAX_DISTANCE, SimHashIndex, bands, content_hash, hamming_distance, simhash,
+    to_signed, to_unsigned,
+)
+from analyzer_app.logic import ParsedPage
+from analyzer_app.store import analyze_and_save, find_near_duplicate, save_analysis
+
+ARTICLE = " ".join(
+    f"Paragraph {i} explains how slow cooking brings out the flavour of seasonal vegetables." for i in range(20)
+)
+HTML = f"<html><head><script>var x = 1;</script></head><body><article><p>{ARTICLE}</p></article></body></html>"
+RESULT = {"overall_score": 70, "topic": "Food", "categories": {"content": {"score": 70}}}
+
+
+def _flip(fingerprint, *bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+class SimHashTests(SimpleTestCase):
+    def test_bands_reassemble_fingerprint(self):
+        fingerprint = random.Random(1).getrandbits(64)
+        parts = bands(fingerprint)
+        self.assertEqual(len(parts), BANDS)
+        self.assertTrue(all(0 <= part < 1 << BAND_BITS for part in parts))
+        self.assertEqual(sum(part << (i * BAND_BITS) for i, part in enumerate(parts)), fingerprint)
+
+    def test_close_fingerprints_share_a_band(self):
+        rng = random.Random(2)
+        for _ in range(200):
+            fingerprint = rng.getrandbits(64)
+            near = _flip(fingerprint, *rng.sample(range(64), MAX_DISTANCE))
+            self.assertTrue(any(a == b for a, b in zip(bands(fingerprint), bands(near))))
+
+    def test_signed_round_trip(self):
+        for fingerprint in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+            signed = to_signed(fingerprint)
+            self.assertTrue(-(1 << 63) <= signed < 1 << 63)
+            self.assertEqual(to_unsigned(signed), fingerprint)
+
+    def test_similar_texts_have_close_fingerprints(self):
+        edited = ARTICLE.replace("Paragraph 7", "Section 7")
+        self.assertLessEqual(hamming_distance(simhash(ARTICLE), simhash(edited)), MAX_DISTANCE)
+        self.assertGreater(hamming_distance(simhash(ARTICLE), simhash("An unrelated note about taxes " * 20)),
+                           MAX_DISTANCE)
+        self.assertEqual(simhash(""), 0)
+
+    def test_content_hash_ignores_whitespace(self):
+        self.assertEqual(content_hash("a  b\nc"), content_hash(" a b c "))
+
+    def test_index_finds_closest(self):
+        index = SimHashIndex()
+        fingerprint = 0x0123456789ABCDEF
+        index.add('far', _flip(fingerprint, 0, 1, 2, 3))
+        index.add('close', _flip(fingerprint, 5))
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.find(fingerprint), 'close')
+        self.assertIsNone(index.find(~fingerprint & ((1 << 64) - 1)))
+
+
+class FindNearDuplicateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.fingerprint = 0x0F0F0F0F12345678
+        self.analysis_id = save_analysis("https://blog.example/post", RESULT,
+                                         fingerprint=self.fingerprint, digest="abc")
+
+    def test_same_site_other_url(self):
+        near = _flip(self.fingerprint, 3)
+        self.assertEqual(find_near_duplicate(near, "https://blog.example/tag/post"), self.analysis_id)
+        self.assertIsNone(find_near_duplicate(_flip(self.fingerprint, 0, 20, 40, 60),
+                                              "https://blog.example/tag/post"))
+
+    def test_same_url_is_never_reused(self):
+        self.assertIsNone(find_near_duplicate(self.fingerprint, "https://blog.example/post?utm_source=x"))
+
+    def test_other_site_needs_identical_text(self):
+        self.assertIsNone(find_near_duplicate(self.fingerprint, "https://mirror.example/post"))
+        self.assertEqual(find_near_duplicate(self.fingerprint, "https://mirror.example/post", "abc"),
+                         self.analysis_id)
+
+    def test_empty_fingerprint(self):
+        self.assertIsNone(find_near_duplicate(0, "https://blog.example/other"))
+
+
+class AnalyzeAndSaveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_parses_once_and_reuses_near_duplicates(self):
+        with mock.patch('analyzer_app.store.analyze_page', return_value=dict(RESULT)) as analyze, \
+                mock.patch('analyzer_app.store.audit_enabled', return_value=False):
+            first_id, _ = analyze_and_save("https://blog.example/post", HTML)
+            parsed = analyze.call_args.kwargs['parsed']
+            self.assertIsInstance(parsed, ParsedPage)
+            self.assertIn("slow cooking", parsed.text)
+            self.assertFalse(parsed.soup.find('script'))
+
+            second_id, data = analyze_and_save("https://blog.example/amp/post", HTML)
+        self.assertEqual(second_id, first_id)
+        self.assertEqual(data['topic'], "Food")
+        self.assertEqual(analyze.call_count, 1)
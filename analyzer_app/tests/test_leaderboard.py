@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from analyzer_app.leaderboard import (
+    ALL_TIME, dashboard_boards, open_boards, rebuild_leaderboards, record_analysis, seasonal_board, top,
+    weekly_board,
+)
+from analyzer_app.models import Analysis, LeaderboardEntry
+
+MONDAY = datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+POST = "https://blog.example/post"
+OTHER_POST = "https://blog.example/other-post"
+
+
+def _result(score, topic="Food", author=""):
+    return {"overall_score": score, "topic": topic, "author": author}
+
+
+class BoardTests(SimpleTestCase):
+    def test_weekly_board(self):
+        self.assertEqual(weekly_board(MONDAY), "week:2026-W43")
+        self.assertEqual(weekly_board(datetime(2027, 1, 1)), "week:2026-W53")
+
+    def test_seasonal_board_wraps_into_january(self):
+        self.assertEqual(seasonal_board(datetime(2026, 12, 24)), "christmas-2026")
+        self.assertEqual(seasonal_board(datetime(2027, 1, 6)), "christmas-2026")
+        self.assertIsNone(seasonal_board(datetime(2027, 1, 7)))
+        self.assertEqual(open_boards(MONDAY), [ALL_TIME, "week:2026-W43"])
+
+
+class RecordAnalysisTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_improvement_of_the_same_page(self):
+        record_analysis(POST, _result(50), when=MONDAY)
+        record_analysis(POST + "?utm_source=news", _result(65, author="Jane Doe"), when=MONDAY)
+        record_analysis(POST, _result(60), when=MONDAY)
+        entry = LeaderboardEntry.objects.get(board=ALL_TIME)
+        self.assertEqual(entry.url, POST)
+        self.assertEqual(entry.host, "blog.example")
+        self.assertEqual((entry.first_score, entry.best_score, entry.latest_score), (50, 65, 60))
+        self.assertEqual((entry.improvement, entry.analyses), (10, 3))
+        self.assertEqual(entry.author, "Jane Doe")
+        self.assertEqual(LeaderboardEntry.objects.filter(board="week:2026-W43").count(), 1)
+
+    def test_pages_of_a_site_are_ranked_separately(self):
+        record_analysis(POST, _result(80), when=MONDAY)
+        record_analysis(OTHER_POST, _result(40), when=MONDAY)
+        record_analysis(OTHER_POST, _result(50), when=MONDAY)
+        self.assertEqual(LeaderboardEntry.objects.filter(board=ALL_TIME).count(), 2)
+        improved = top(order='improved')
+        self.assertEqual([(row["url"], row["improvement"], row["growth"]) for row in improved], [(OTHER_POST, 10, 25)])
+        self.assertEqual([row["url"] for row in top(order='best')], [POST, OTHER_POST])
+
+    def test_top_is_refreshed_after_updates(self):
+        record_analysis(POST, _result(50), when=MONDAY)
+        self.assertEqual(top(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            record_analysis(POST, _result(70), when=MONDAY)
+        self.assertEqual(top()[0]["improvement"], 20)
+
+    def test_topic_filter_follows_reclassification(self):
+        record_analysis(POST, _result(50, topic="Food"), when=MONDAY)
+        record_analysis(POST, _result(70, topic="Travel"), when=MONDAY)
+        self.assertEqual(top(topic="Food"), [])
+        self.assertEqual(top(topic="Travel")[0]["topic"], "Travel")
+
+    def test_ignores_results_without_a_score(self):
+        record_analysis(POST, {"topic": "Food"}, when=MONDAY)
+        record_analysis("", _result(50), when=MONDAY)
+        self.assertFalse(LeaderboardEntry.objects.exists())
+
+    def test_rebuild_replays_analyses(self):
+        for url, score in ((POST, 40), (OTHER_POST, 90), (POST, 55)):
+            analysis = Analysis.objects.create(url=url, host="blog.example", result=_result(score))
+            record_analysis(url, analysis.result, when=analysis.created_at)
+        before = sorted(LeaderboardEntry.objects.values_list('board', 'url', 'improvement', 'best_score'))
+        self.assertEqual(rebuild_leaderboards(), 3)
+        after = sorted(LeaderboardEntry.objects.values_list('board', 'url', 'improvement', 'best_score'))
+        self.assertEqual(after, before)
+
+    def test_dashboard_boards(self):
+        record_analysis(POST, _result(50), when=MONDAY)
+        record_analysis(POST, _result(60), when=MONDAY)
+        boards = dashboard_boards(when=MONDAY)
+        self.assertEqual([board["board"] for board in boards], ["week:2026-W43", ALL_TIME, ALL_TIME])
+        self.assertEqual(boards[0]["entries"][0]["initials"], "B")
@@ -0,0 +1,52 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from analyzer_app import phrases
+from analyzer_app.logic import detect_topic
+from analyzer_app.nlp_cache import sentence_cache
+
+LONG_TEXT = " ".join(f"Roasted vegetables number {i} taste great with olive oil." for i in range(2000))
+
+
+class ExtractNounPhrasesTests(SimpleTestCase):
+    def setUp(self):
+        sentence_cache.clear()
+
+    def test_ngram_backend(self):
+        self.assertEqual(
+            phrases.extract_noun_phrases("The roasted vegetables were great.", backend='ngram'),
+            ['roasted', 'roasted vegetables', 'vegetables', 'great'],
+        )
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            phrases.extract_noun_phrases("Text.", backend='nope')
+
+    def test_request_path_never_uses_the_pool(self):
+        with mock.patch.object(phrases, 'MAX_WORKERS', 4), \
+                mock.patch.object(phrases, '_get_pool', side_effect=AssertionError("pool used")):
+            self.assertTrue(phrases.extract_noun_phrases(LONG_TEXT, backend='ngram'))
+            sentence_cache.clear()
+            topic, _ = detect_topic(LONG_TEXT, {"Food": {"keywords": ["roasted vegetables", "olive"]}}, backend='ngram')
+        self.assertEqual(topic, "Food")
+
+    def test_batch_jobs_use_the_pool(self):
+        pool = mock.Mock()
+        pool.map.side_effect = lambda fn, *args: list(map(fn, *args))
+        with mock.patch.object(phrases, 'MAX_WORKERS', 4), mock.patch.object(phrases, '_get_pool', return_value=pool):
+            inline = phrases.extract_noun_phrases(LONG_TEXT, backend='ngram')
+            sentence_cache.clear()
+            self.assertEqual(phrases.extract_many([LONG_TEXT], backend='ngram'), [inline])
+        pool.map.assert_called_once()
+
+    def test_ngram_uses_the_language_stop_words(self):
+        sentence = "Die gerösteten Gemüse waren sehr lecker und nicht teuer."
+        german = phrases.extract_noun_phrases(sentence, backend='ngram', language='german')
+        self.assertNotIn('und', german)
+        self.assertNotIn('nicht', german)
+        self.assertIn('gerösteten gemüse', german)
+        # English stop words would keep the German ones, and the cache must not mix them up
+        english = phrases.extract_noun_phrases(sentence, backend='ngram')
+        self.assertIn('und', english)
+        self.assertIsNotNone(sentence_cache.get(sentence, 'np:ngram:german'))
@@ -0,0 +1,61 @@
+from django.test import SimpleTestCase
+
+from analyzer_app.readability import TARGET_GRADE, _score, readability, syllables
+
+SHORT = "The cat sat. It was happy."
+LONG_SENTENCE = " ".join(["Unbelievably complicated considerations"] * 11) + "."
+
+
+class SyllableTests(SimpleTestCase):
+    def test_heuristic(self):
+        for word, expected in (("cat", 1), ("make", 1), ("table", 2), ("jumped", 1), ("wanted", 2),
+                               ("boxes", 2), ("beautiful", 3), ("rhythm", 1), ("don't", 1)):
+            with self.subTest(word=word):
+                self.assertEqual(syllables(word), expected)
+
+    def test_exceptions_and_case(self):
+        self.assertEqual(syllables("Recipe"), 3)
+        self.assertEqual(syllables("people"), 2)
+        self.assertEqual(syllables("hmm"), 1)
+
+
+class ReadabilityTests(SimpleTestCase):
+    def test_formulas(self):
+        result = readability(SHORT)
+        # 6 words, 2 sentences, 7 syllables ("happy" has 2), no complex words
+        self.assertEqual((result.words, result.sentences, result.syllables, result.complex_words), (6, 2, 7, 0))
+        words_per_sentence, syllables_per_word = 3, 7 / 6
+        self.assertEqual(result.flesch_reading_ease,
+                         round(206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 1))
+        self.assertEqual(result.flesch_kincaid_grade,
+                         round(0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59, 1))
+        self.assertEqual(result.gunning_fog, round(0.4 * words_per_sentence, 1))
+        self.assertEqual(result.score, 100)
+
+    def test_sentence_lengths(self):
+        text = f"{SHORT} {LONG_SENTENCE}"
+        result = readability(text)
+        self.assertEqual(result.long_sentences, 1)
+        lengths = result.sentence_lengths
+        self.assertEqual((lengths["max"], lengths["median"]), (33, 3.0))
+        self.assertEqual(lengths["buckets"], {"1-10": 2, "11-20": 0, "21-30": 0, "31+": 1})
+        self.assertEqual(result.complex_words, 33)
+
+    def test_worst_sentences_point_into_the_text(self):
+        text = f"{SHORT} {LONG_SENTENCE}"
+        worst = readability(text).worst_sentences
+        self.assertEqual(len(worst), 3)
+        self.assertEqual(text[worst[0]['start']:worst[0]['end']], LONG_SENTENCE)
+        self.assertEqual(worst[0]['words'], 33)
+        grades = [sentence['grade'] for sentence in worst]
+        self.assertEqual(grades, sorted(grades, reverse=True))
+
+    def test_empty_text(self):
+        result = readability("... !!")
+        self.assertEqual((result.words, result.score, result.worst_sentences), (0, 0, []))
+
+    def test_score_drops_above_target_grade(self):
+        self.assertEqual(_score(TARGET_GRADE), 100)
+        self.assertEqual(_score(TARGET_GRADE + 2), 84)
+        self.assertEqual(_score(TARGET_GRADE + 20), 0)
+        self.assertLess(readability(LONG_SENTENCE).score, readability(SHORT).score)
@@ -0,0 +1,92 @@
+import os
+import tempfile
+
+import nltk
+from django.test import SimpleTestCase
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+from analyzer_app.nlp_cache import SentenceCache
+from analyzer_app.sentiment import SentimentEngine
+
+LEXICON = {
+    'good': 1.9, 'bad': -2.5, 'great': 3.1, 'okay': 0.9, 'awful': -2.0, 'love': 3.2, 'hate': -2.7,
+    'bomb': -2.2, 'death': -2.9, 'kind': 2.4, 'sad': -2.1, ':)': 2.0, 'right': 0.9, 'no': -1.2,
+}
+
+TEXTS = [
+    "It was never so good",
+    "The food was very good. But the service was bad.",
+    "It was good. It was bad but okay. The end was great",
+    "It was the bomb, yeah right.",
+    "That is kind of good, sort of great.",
+    "I do not love it. NOT AT ALL good!!",
+    "At least it was good? Really?? At the very least good.",
+    "good good. not good",
+    "It isn't bad :) at all",
+    "It was GOOD but the BAD part was awful!!!",
+    "never this good, so never this great",
+    "A kiss of death for a kind of sad, kind idea.",
+    "Barely okay... extremely awful (hate it), no.",
+    "",
+    "a b c",
+]
+
+
+def _analyzer(lexicon):
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        f.write("\n".join(f"{word}\t{value}\t0.5\t[1]" for word, value in lexicon.items()))
+    try:
+        return SentimentIntensityAnalyzer(lexicon_file='file:' + f.name)
+    finally:
+        os.unlink(f.name)
+
+
+class SentimentEngineTests(SimpleTestCase):
+    def setUp(self):
+        self.sia = _analyzer(LEXICON)
+        self.engine = SentimentEngine(self.sia.lexicon, self.sia.constants)
+
+    def assertMatchesVader(self, sia, engine, text):
+        result = engine.score(text, cache=None)
+        self.assertAlmostEqual(result.compound, sia.polarity_scores(text)['compound'], places=4, msg=text)
+        for (start, end), score in zip(result.sentences, result.sentence_scores):
+            sentence = text[start:end]
+            self.assertAlmostEqual(score, sia.polarity_scores(sentence)['compound'], places=4, msg=sentence)
+
+    def test_matches_polarity_scores(self):
+        for text in TEXTS:
+            self.assertMatchesVader(self.sia, self.engine, text)
+
+    def test_never_so_is_not_a_negation(self):
+        self.assertGreater(self.engine.score("It was never so good", cache=None).compound, 0)
+
+    def test_but_applies_once_per_document(self):
+        text = "It was good. It was bad but okay. The end was great"
+        self.assertAlmostEqual(self.engine.score(text, cache=None).compound, 0.8271, places=4)
+
+    def test_cached_sentences_score_the_same(self):
+        cache = SentenceCache()
+        for text in TEXTS:
+            first = self.engine.score(text, cache=cache)
+            second = self.engine.score(text, cache=cache)
+            self.assertEqual(first.compound, second.compound)
+            self.assertEqual(list(first.sentence_scores), list(second.sentence_scores))
+            self.assertEqual(first.negative_words, second.negative_words)
+
+    def test_negative_words_point_into_their_sentence(self):
+        text = "Nice start. Then an awful, sad ending."
+        result = self.engine.score(text, cache=None)
+        start, _ = result.sentences[1]
+        for word, offset in result.negative_words[1]:
+            self.assertEqual(text[start + offset:start + offset + len(word)], word)
+        self.assertEqual([word for word, _ in result.negative_words[1]], ['awful', 'sad'])
+
+    def test_matches_polarity_scores_with_full_lexicon(self):
+        try:
+            nltk.data.find('sentiment/vader_lexicon.zip')
+        except LookupError:
+            self.skipTest("vader_lexicon is not downloaded")
+        sia = SentimentIntensityAnalyzer()
+        engine = SentimentEngine(sia.lexicon, sia.constants)
+        for text in TEXTS:
+            self.assertMatchesVader(sia, engine, text)
@@ -0,0 +1,144 @@
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from analyzer_app import throttle
+from analyzer_app.store import RESULT_CACHE_TIMEOUT, _cache_key
+from analyzer_app.throttle import RateLimited, analyze_url, check_rate
+
+URL = "https://blog.example/post"
+
+
+class FakeAnalyzer:
+    """
+    Stands in for fetch + analyze_and_save, blocking until released so
+    concurrent callers pile up on the same flight.
+    """
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.error = error
+
+    def __call__(self, url, html, **kwargs):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        data = {"url": url}
+        cache.set(_cache_key(self.calls), data, RESULT_CACHE_TIMEOUT)
+        return self.calls, data
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.fake = FakeAnalyzer()
+        self.followers = threading.Semaphore(0)
+        followers = self.followers
+
+        class Done(threading.Event):
+            def wait(self, timeout=None):
+                followers.release()
+                return super().wait(timeout)
+
+        class Flight(throttle._Flight):
+            def __init__(self):
+                super().__init__()
+                self.done = Done()
+
+        response = mock.Mock(text="<html></html>", headers={})
+        for patcher in (mock.patch.object(throttle, 'fetch_response', return_value=response),
+                        mock.patch.object(throttle, 'analyze_and_save', self.fake),
+                        mock.patch.object(throttle, '_Flight', Flight)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _run_concurrently(self, urls):
+        results, errors = [], []
+
+        def run(url):
+            try:
+                results.append(analyze_url(url))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(url,)) for url in urls]
+        threads[0].start()
+        self.fake.started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        # Every follower waits on the flight before the leader finishes
+        for _ in threads[1:]:
+            self.assertTrue(self.followers.acquire(timeout=5))
+        self.fake.release.set()
+        for thread in threads:
+            thread.join(5)
+        return results, errors
+
+    def test_concurrent_requests_share_one_analysis(self):
+        urls = [URL, URL + "?utm_source=x", URL + "#top", "HTTPS://Blog.Example/post"] * 3
+        results, errors = self._run_concurrently(urls)
+        self.assertEqual(errors, [])
+        self.assertEqual(self.fake.calls, 1)
+        self.assertEqual({analysis_id for analysis_id, _ in results}, {1})
+        self.assertEqual(throttle._flights, {})
+
+    def test_recent_analysis_is_reused(self):
+        self.fake.release.set()
+        first = analyze_url(URL)
+        self.assertEqual(analyze_url(URL + "?utm_campaign=y"), first)
+        self.assertEqual(self.fake.calls, 1)
+        with override_settings(ANALYZER_COALESCE_SECONDS=0):
+            cache.clear()
+            analyze_url(URL)
+        self.assertEqual(self.fake.calls, 2)
+
+    def test_leader_errors_reach_followers(self):
+        self.fake.error = ValueError("fetch failed")
+        results, errors = self._run_concurrently([URL] * 4)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 4)
+        self.assertTrue(all(str(e) == "fetch failed" for e in errors))
+        self.assertEqual(self.fake.calls, 1)
+        # Failures are not coalesced: the next request tries again
+        self.fake.error = None
+        self.assertEqual(analyze_url(URL)[0], 2)
+
+    @override_settings(ANALYZER_HOST_RATE_LIMIT=1)
+    def test_host_limit_counts_fetches_only(self):
+        self.fake.release.set()
+        analyze_url(URL)
+        analyze_url(URL)  # coalesced, not fetched again
+        with self.assertRaises(RateLimited):
+            analyze_url("https://blog.example/other")
+        self.assertEqual(self.fake.calls, 1)
+
+
+class CheckRateTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_limit_per_window(self):
+        with mock.patch('analyzer_app.throttle.time.time', return_value=1000):
+            check_rate('client', '1.2.3.4', 2, 60)
+            check_rate('client', '1.2.3.4', 2, 60)
+            check_rate('client', '5.6.7.8', 2, 60)
+            with self.assertRaises(RateLimited) as raised:
+                check_rate('client', '1.2.3.4', 2, 60)
+        self.assertEqual(raised.exception.retry_after, 20)
+        # A new window starts a new count
+        with mock.patch('analyzer_app.throttle.time.time', return_value=1020):
+            check_rate('client', '1.2.3.4', 2, 60)
+
+    def test_zero_disables(self):
+        for _ in range(5):
+            check_rate('host', 'blog.example', 0, 60)
+
+    def test_evicted_counter_restarts(self):
+        with mock.patch.object(throttle.cache, 'incr', side_effect=ValueError):
+            check_rate('host', 'blog.example', 1, 60)
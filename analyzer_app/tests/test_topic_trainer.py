@@ -0,0 +1,116 @@
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from analyzer_app import topic_trainer
+from analyzer_app.topic_trainer import TopicStats, write_topic_models
+
+
+def _stats():
+    stats = TopicStats()
+    stats.add_document("Food", "https://a.example/", ["recipe", "recipe", "oven"], 0.5, fingerprint=1)
+    stats.add_document("Food", "https://b.example/", ["recipe", "salad"], 0.1, fingerprint=2)
+    stats.add_document("Music", "https://c.example/", ["album", "tour"], 0.3)
+    return stats
+
+
+class TopicStatsTests(SimpleTestCase):
+    def test_add_document_updates_totals(self):
+        food = _stats().topics["Food"]
+        self.assertEqual(food["counts"], {"recipe": 3, "oven": 1, "salad": 1})
+        self.assertEqual(food["df"], {"recipe": 2, "oven": 1, "salad": 1})
+        self.assertEqual(food["docs"], 2)
+        self.assertAlmostEqual(food["sentiment_sum"], 0.6)
+
+    def test_readding_a_url_replaces_it(self):
+        stats = _stats()
+        stats.add_document("Food", "https://a.example/?utm_source=x", ["bread"], 0.0)
+        self.assertEqual(stats.topics["Food"]["counts"], {"recipe": 1, "salad": 1, "bread": 1})
+        self.assertEqual(stats.topics["Food"]["docs"], 2)
+
+    def test_remove_document_undoes_add(self):
+        stats = _stats()
+        self.assertTrue(stats.remove_document("https://b.example/"))
+        self.assertFalse(stats.remove_document("https://b.example/"))
+        food = stats.topics["Food"]
+        self.assertEqual(food["counts"], {"recipe": 2, "oven": 1})
+        self.assertEqual(food["df"], {"recipe": 1, "oven": 1})
+        self.assertEqual(food["docs"], 1)
+        self.assertAlmostEqual(food["sentiment_sum"], 0.5)
+        self.assertFalse(stats.has_document("https://b.example/"))
+
+    def test_remove_topic(self):
+        stats = _stats()
+        stats.remove_topic("Food")
+        self.assertEqual(set(stats.topics), {"Music"})
+        self.assertEqual(list(stats.documents), ["https://c.example/"])
+        self.assertIsNone(stats.find_near_duplicate("https://d.example/", 1))
+
+    def test_topic_models(self):
+        models = _stats().topic_models(top_k=2)
+        self.assertEqual(models["Food"]["keywords"], ["recipe", "salad"])
+        self.assertAlmostEqual(models["Food"]["avg_sentiment"], 0.3)
+
+    def test_near_duplicates_ignore_the_same_url(self):
+        stats = _stats()
+        self.assertEqual(stats.find_near_duplicate("https://d.example/", 5), "https://a.example/")
+        self.assertIsNone(stats.find_near_duplicate("https://a.example/", 1))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "stats.json")
+            _stats().save(path)
+            loaded = TopicStats.load(path)
+        self.assertEqual(loaded.topic_models(), _stats().topic_models())
+
+
+class TrainerCommandTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.models_path = os.path.join(tmp.name, "topic_models.json")
+        self.stats_path = os.path.join(tmp.name, "topic_stats.json")
+        with open(self.models_path, 'w') as f:
+            json.dump({"Food": {}, "Music": {}, "Travel": {}}, f)
+        for name, value in (("MODELS_PATH", self.models_path), ("STATS_PATH", self.stats_path)):
+            patcher = mock.patch.object(topic_trainer, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _main(self, *argv):
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            topic_trainer.main(list(argv))
+
+    def _models(self):
+        with open(self.models_path) as f:
+            return json.load(f)
+
+    def test_incremental_commands_need_stats(self):
+        for argv in (["rebuild"], ["remove", "https://a.example/"], ["remove-topic", "Food"]):
+            with self.assertRaises(SystemExit):
+                self._main(*argv)
+        self.assertEqual(set(self._models()), {"Food", "Music", "Travel"})
+        self.assertFalse(os.path.exists(self.stats_path))
+
+    def test_never_drops_topics(self):
+        _stats().save(self.stats_path)
+        with self.assertRaises(SystemExit):
+            self._main("rebuild")
+        self.assertEqual(self._models(), {"Food": {}, "Music": {}, "Travel": {}})
+
+        self._main("remove-topic", "Travel")
+        self.assertEqual(set(self._models()), {"Food", "Music"})
+        self.assertEqual(self._models()["Food"]["keywords"][0], "recipe")
+
+    def test_write_topic_models_allows_new_topics(self):
+        stats = _stats()
+        stats.add_document("Travel", "https://t.example/", ["beach"], 0.2)
+        stats.add_document("Art", "https://art.example/", ["canvas"], 0.2)
+        with redirect_stdout(io.StringIO()):
+            self.assertIsNotNone(write_topic_models(stats, self.models_path))
+        self.assertEqual(set(self._models()), {"Food", "Music", "Travel", "Art"})
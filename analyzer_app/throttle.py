@@ -0,0 +1,171 @@
+"""
+Request coalescing and rate limits for on-demand analyses.
+
+When a URL is shared widely, many visitors submit it at the same moment.
+analyze_url() makes them share one fetch and one analysis (single flight):
+threads of the same process wait on an in-memory flight, other processes
+wait on a lock in the Django cache. Rate limits are fixed-window counters in
+the same cache, per client IP and per target host.
+
+With the default local-memory cache both only apply within one process;
+configure a shared cache (Redis, Memcached) to apply them across workers.
+"""
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .logic import fetch_response, normalize_url
+from .store import analyze_and_save, load_analysis
+
+# Longer than a fetch (15s timeout) plus a full analysis of a large page
+LOCK_TIMEOUT = 120
+POLL_INTERVAL = 0.25
+
+
+class RateLimited(Exception):
+    """
+    Raised when a client or target host is over its request budget.
+    """
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Tuple[int, Dict[str, Any]]] = None
+        self.error: Optional[BaseException] = None
+
+
+_flights: Dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+
+
+def _setting(name: str, default: int) -> int:
+    return getattr(settings, name, default)
+
+
+def check_rate(scope: str, ident: str, limit: int, window: int) -> None:
+    """
+    Counts one request against scope/ident and raises RateLimited once more
+    than limit requests were made in the current window of window seconds.
+    A limit of 0 disables the check.
+    """
+    if not limit:
+        return
+    now = int(time.time())
+    key = f'ratelimit:{scope}:{ident}:{now // window}'
+    cache.add(key, 0, window)
+    try:
+        count = cache.incr(key)
+    except ValueError:  # expired or evicted between add() and incr()
+        cache.set(key, 1, window)
+        count = 1
+    if count > limit:
+        raise RateLimited(
+            f"Too many requests for {ident}. Please try again shortly.", retry_after=window - now % window,
+        )
+
+
+def client_ip(request) -> str:
+    return request.META.get('REMOTE_ADDR') or 'unknown'
+
+
+def check_client_rate(request) -> None:
+    """
+    Per-client budget for analyses that aren't already in the visitor's session.
+    """
+    check_rate(
+        'client', client_ip(request),
+        _setting('ANALYZER_CLIENT_RATE_LIMIT', 10), _setting('ANALYZER_RATE_WINDOW', 60),
+    )
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+
+
+def _recent(key: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+    analysis_id = cache.get(f'inflight:done:{key}')
+    data = load_analysis(analysis_id) if analysis_id else None
+    return (analysis_id, data) if data is not None else None
+
+
+def _lead(url: str, key: str) -> Tuple[int, Dict[str, Any]]:
+    """
+    Runs the analysis for this process, unless another process already is,
+    in which case its result is awaited through the cache.
+    """
+    lock_key = f'inflight:lock:{key}'
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        time.sleep(POLL_INTERVAL)
+        recent = _recent(key)
+        if recent is not None:
+            return recent
+        if time.monotonic() > deadline:
+            raise ValueError("Timed out waiting for another analysis of this URL.")
+
+    try:
+        # Finished while we were acquiring the lock
+        recent = _recent(key)
+        if recent is not None:
+            return recent
+        # Only real fetches count against the target site, not coalesced requests
+        check_rate(
+            'host', (urlsplit(url).hostname or '').lower(),
+            _setting('ANALYZER_HOST_RATE_LIMIT', 30), _setting('ANALYZER_RATE_WINDOW', 60),
+        )
+        response = fetch_response(url)
+        analysis_id, data = analyze_and_save(
+            url, response.text,
+            etag=response.headers.get('ETag', ''), last_modified=response.headers.get('Last-Modified', ''),
+        )
+        cache.set(f'inflight:done:{key}', analysis_id, _setting('ANALYZER_COALESCE_SECONDS', 30))
+        return analysis_id, data
+    finally:
+        cache.delete(lock_key)
+
+
+def analyze_url(url: str) -> Tuple[int, Dict[str, Any]]:
+    """
+    Fetches, analyzes and stores url, sharing the work with every concurrent
+    request for the same normalized URL. Requests arriving within
+    ANALYZER_COALESCE_SECONDS of a finished analysis reuse it as well.
+    Returns (analysis_id, result); raises ValueError or RateLimited.
+    """
+    key = _url_key(url)
+    recent = _recent(key)
+    if recent is not None:
+        return recent
+
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        if not flight.done.wait(LOCK_TIMEOUT):
+            raise ValueError("Timed out waiting for another analysis of this URL.")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = _lead(url, key)
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
@@ -0,0 +1,50 @@
+import re
+from typing import List, NamedTuple, Tuple
+
+# Sentences end at terminal punctuation or a line break; get_text() output
+# puts every nav item / heading on its own line, so newlines matter here.
+SENTENCE_RE = re.compile(r'[^\n.!?]+[.!?]*')
+WORD_RE = re.compile(r"[A-Za-z0-9]+(?:['’][A-Za-z]+)*")
+# Words of any script ("gerösteten", "café"); no digits
+LETTER_WORD_RE = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+
+
+class Tokens(NamedTuple):
+    text: str
+    sentences: List[Tuple[int, int]]  # (start, end) offsets into text
+    words: List[str]
+    offsets: List[int]  # start offset of each word
+    sentence_ids: List[int]  # index into sentences for each word
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """
+    Returns (start, end) character offsets of every non-empty sentence in text.
+    """
+    spans = []
+    for match in SENTENCE_RE.finditer(text):
+        start, end = match.span()
+        chunk = match.group()
+        if not WORD_RE.search(chunk):
+            continue
+        start += len(chunk) - len(chunk.lstrip())
+        end -= len(chunk) - len(chunk.rstrip())
+        spans.append((start, end))
+    return spans
+
+
+def tokenize(text: str) -> Tokens:
+    """
+    Splits text into sentences and words in a single pass, keeping offsets
+    so later stages can point back at the original text.
+    """
+    sentences = split_sentences(text)
+    words = []
+    offsets = []
+    sentence_ids = []
+    for sentence_index, (start, end) in enumerate(sentences):
+        for match in WORD_RE.finditer(text, start, end):
+            words.append(match.group().replace('’', "'"))
+            offsets.append(match.start())
+            sentence_ids.append(sentence_index)
+    return Tokens(text, sentences, words, offsets, sentence_ids)
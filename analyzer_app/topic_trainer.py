@@ -1,9 +1,22 @@
 import requests
 from bs4 import BeautifulSoup
 from textblob import TextBlob
+import argparse
+import heapq
 import json
+import os
 from collections import Counter
 
+from .fingerprint import SimHashIndex, simhash
+from .logic import extract_text, normalize_url
+from .phrases import extract_many
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_PATH = os.path.join(BASE_DIR, 'topic_models.json')
+# Per-document keyword counts that topic_models.json is generated from
+STATS_PATH = os.path.join(BASE_DIR, 'topic_stats.json')
+TOP_KEYWORDS = 50
+
 # Curated NICHE blogs - personal/enthusiast sites, NOT general news
 TOPIC_URLS = {
     "Food": [
@@ -195,8 +208,12 @@ TOPIC_URLS = {
     ]
 }
 
-def fetch_blog_keywords(url):
-    """Fetch a blog and extract keywords using TextBlob."""
+def fetch_blog_text(url):
+    """Fetch a blog and return its main text.
+
+    Returns (text, sentiment, simhash fingerprint of the text), or None if
+    the page could not be fetched.
+    """
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
@@ -206,58 +223,235 @@ def fetch_blog_keywords(url):
         
         soup = BeautifulSoup(response.text, 'html.parser')
         
-        # Remove scripts and styles
-        for script in soup(["script", "style"]):
-            script.extract()
-        
-        text = soup.get_text()
-        
-        # Use TextBlob to extract noun phrases (keywords)
-        blob = TextBlob(text)
-        phrases = [p.lower() for p in blob.noun_phrases if len(p) > 3]
+        # Only the main content; menus and footers would swamp the keywords
+        text = extract_text(soup)
         
         # Get sentiment
-        sentiment = blob.sentiment.polarity
+        sentiment = TextBlob(text).sentiment.polarity
         
-        return phrases, sentiment
+        return text, sentiment, simhash(text)
     except Exception as e:
         print(f"Error fetching {url}: {e}")
-        return [], 0.0
+        return None
+
+def extract_keywords(texts):
+    """Noun phrases (keywords) of each text, extracted in one process-pool batch."""
+    return [[p for p in phrases if len(p) > 3] for phrases in extract_many(texts)]
+
+class TopicStats:
+    """Persistent keyword statistics behind topic_models.json.
+
+    Keeps the keyword counts of every trained document plus per-topic totals
+    and document frequencies, so adding or removing a URL or a topic only
+    touches the documents involved. The top-k keyword lists are then
+    regenerated from the stored counts without crawling anything.
+    """
+
+    def __init__(self, data=None):
+        data = data or {}
+        # normalized url -> {"topic", "counts", "sentiment", "simhash"}
+        self.documents = data.get("documents", {})
+        # topic -> {"counts": {kw: n}, "df": {kw: docs}, "docs": n, "sentiment_sum": x}
+        self.topics = data.get("topics", {})
+        self._index = None
+
+    @classmethod
+    def load(cls, path=STATS_PATH):
+        try:
+            with open(path, 'r') as f:
+                return cls(json.load(f))
+        except FileNotFoundError:
+            return cls()
+
+    def save(self, path=STATS_PATH):
+        # Write to a temp file first so an interrupted run can't corrupt the stats
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"documents": self.documents, "topics": self.topics}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def _near_duplicates(self):
+        if self._index is None:
+            self._index = SimHashIndex()
+            for url, doc in self.documents.items():
+                if doc.get("simhash") is not None:
+                    self._index.add(url, doc["simhash"])
+        return self._index
+
+    def find_near_duplicate(self, url, fingerprint):
+        """Returns another stored URL whose text nearly matches fingerprint."""
+        duplicate = self._near_duplicates().find(fingerprint)
+        return duplicate if duplicate != normalize_url(url) else None
+
+    def add_document(self, topic, url, keywords, sentiment, fingerprint=None):
+        url = normalize_url(url)
+        if url in self.documents:
+            self.remove_document(url)
+        counts = Counter(keywords)
+        self.documents[url] = {
+            "topic": topic,
+            "counts": dict(counts),
+            "sentiment": sentiment,
+            "simhash": fingerprint,
+        }
+        totals = self.topics.setdefault(topic, {"counts": {}, "df": {}, "docs": 0, "sentiment_sum": 0.0})
+        for kw, count in counts.items():
+            totals["counts"][kw] = totals["counts"].get(kw, 0) + count
+            totals["df"][kw] = totals["df"].get(kw, 0) + 1
+        totals["docs"] += 1
+        totals["sentiment_sum"] += sentiment
+        if fingerprint is not None and self._index is not None:
+            self._index.add(url, fingerprint)
+
+    def remove_document(self, url):
+        """Removes a URL's contribution; returns False if it wasn't stored."""
+        url = normalize_url(url)
+        doc = self.documents.pop(url, None)
+        if doc is None:
+            return False
+        totals = self.topics[doc["topic"]]
+        for kw, count in doc["counts"].items():
+            for field, amount in (("counts", count), ("df", 1)):
+                remaining = totals[field].get(kw, 0) - amount
+                if remaining > 0:
+                    totals[field][kw] = remaining
+                else:
+                    totals[field].pop(kw, None)
+        totals["docs"] -= 1
+        totals["sentiment_sum"] -= doc["sentiment"]
+        self._index = None
+        return True
+
+    def remove_topic(self, topic):
+        for url in [url for url, doc in self.documents.items() if doc["topic"] == topic]:
+            self.documents.pop(url)
+        self.topics.pop(topic, None)
+        self._index = None
+
+    def has_document(self, url):
+        return normalize_url(url) in self.documents
+
+    def topic_models(self, top_k=TOP_KEYWORDS):
+        """Builds the topic_models.json structure from the stored counts."""
+        topic_models = {}
+        for topic, totals in self.topics.items():
+            top = heapq.nlargest(top_k, totals["counts"].items(), key=lambda item: (item[1], item[0]))
+            topic_models[topic] = {
+                "keywords": [kw for kw, count in top],
+                "avg_sentiment": totals["sentiment_sum"] / totals["docs"] if totals["docs"] else 0.0
+            }
+        return topic_models
+
+def read_topic_models(path=MODELS_PATH):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def write_topic_models(stats, path=MODELS_PATH, removed=()):
+    """Writes topic_models.json, unless that would drop topics it already has.
+
+    Topics in removed are dropped on purpose. Returns None when nothing was written.
+    """
+    topic_models = stats.topic_models()
+    lost = sorted(set(read_topic_models(path)) - set(topic_models) - set(removed))
+    if lost:
+        print(f"\nNot saving {path}: the topic(s) {', '.join(lost)} would be lost. "
+              "Retrain them, or drop them with remove-topic.")
+        return None
+    with open(path, 'w') as f:
+        json.dump(topic_models, f, indent=2)
+    print(f"\nTopic models saved to {path}")
+    return topic_models
+
+def add_urls(stats, topic, urls, seen_urls=None):
+    """Fetch and add URLs to a topic. Returns how many documents were added.
+
+    URLs already in seen_urls (normalized) are skipped; pass the same set
+    across topics so a blog listed twice is only counted once.
+    """
+    seen_urls = set() if seen_urls is None else seen_urls
+    pending = []
+    pending_index = SimHashIndex()
+    for url in urls:
+        # TOPIC_URLS repeats some blogs, sometimes with ?utm_campaign= variants
+        normalized = normalize_url(url)
+        if normalized in seen_urls:
+            continue
+        seen_urls.add(normalized)
+        
+        print(f"  Analyzing: {url}")
+        fetched = fetch_blog_text(url)
+        if fetched is None:
+            continue
+        text, sentiment, fingerprint = fetched
+        duplicate = stats.find_near_duplicate(url, fingerprint) or pending_index.find(fingerprint)
+        if duplicate is not None:
+            # Near-duplicates would skew the keyword counts
+            print(f"  Skipping near-duplicate of {duplicate}")
+            continue
+        pending_index.add(normalized, fingerprint)
+        pending.append((url, text, sentiment, fingerprint))
+    
+    # Tagging is the slow part, so all fetched pages are chunked into one pool batch
+    keywords = extract_keywords([text for url, text, sentiment, fingerprint in pending])
+    for (url, text, sentiment, fingerprint), doc_keywords in zip(pending, keywords):
+        stats.add_document(topic, url, doc_keywords, sentiment, fingerprint)
+    return len(pending)
 
 def train_topic_models():
-    """Train topic models by analyzing blogs and extracting common keywords."""
-    topic_models = {}
+    """Train topic models from scratch by analyzing every blog in TOPIC_URLS."""
+    stats = TopicStats()
+    seen_urls = set()
     
     for topic, urls in TOPIC_URLS.items():
         print(f"\nTraining {topic}...")
-        all_keywords = []
-        all_sentiments = []
-        
-        for url in urls:
-            print(f"  Analyzing: {url}")
-            keywords, sentiment = fetch_blog_keywords(url)
-            all_keywords.extend(keywords)
-            all_sentiments.append(sentiment)
-        
-        # Find most common keywords
-        keyword_counts = Counter(all_keywords)
-        top_keywords = [kw for kw, count in keyword_counts.most_common(50)]
-        
-        # Average sentiment
-        avg_sentiment = sum(all_sentiments) / len(all_sentiments) if all_sentiments else 0.0
-        
-        topic_models[topic] = {
-            "keywords": top_keywords,
-            "avg_sentiment": avg_sentiment
-        }
-        
-        print(f"  Found {len(top_keywords)} keywords")
+        add_urls(stats, topic, urls, seen_urls)
+        print(f"  Found {len(stats.topic_models().get(topic, {}).get('keywords', []))} keywords")
     
-    # Save to JSON
-    with open('topic_models.json', 'w') as f:
-        json.dump(topic_models, f, indent=2)
-    
-    print("\nTopic models saved to topic_models.json")
+    stats.save(STATS_PATH)
+    return write_topic_models(stats, MODELS_PATH)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Train topic models. Without a command, retrains every topic in TOPIC_URLS from scratch."
+    )
+    commands = parser.add_subparsers(dest="command")
+    add = commands.add_parser("add", help="Fetch URLs and add them to a topic (a new topic is created if needed).")
+    add.add_argument("topic")
+    add.add_argument("urls", nargs="*", help="Defaults to the topic's URLs in TOPIC_URLS.")
+    remove = commands.add_parser("remove", help="Remove URLs from the models.")
+    remove.add_argument("urls", nargs="+")
+    remove_topic = commands.add_parser("remove-topic", help="Remove a whole topic.")
+    remove_topic.add_argument("topic")
+    commands.add_parser("rebuild", help="Regenerate topic_models.json from the stored counts.")
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        if train_topic_models() is None:
+            parser.exit(1)
+        return
+
+    if not os.path.exists(STATS_PATH):
+        # Without the stored counts, every other topic would vanish from topic_models.json
+        parser.error(f"{STATS_PATH} not found; run a full training first (python -m analyzer_app.topic_trainer)")
+    stats = TopicStats.load(STATS_PATH)
+    removed = ()
+    if args.command == "add":
+        urls = args.urls or TOPIC_URLS.get(args.topic, [])
+        print(f"Adding {len(urls)} URL(s) to {args.topic}...")
+        add_urls(stats, args.topic, urls)
+    elif args.command == "remove":
+        for url in args.urls:
+            if not stats.remove_document(url):
+                print(f"  Not in the models: {url}")
+    elif args.command == "remove-topic":
+        stats.remove_topic(args.topic)
+        removed = (args.topic,)
+    stats.save(STATS_PATH)
+    if write_topic_models(stats, MODELS_PATH, removed=removed) is None:
+        parser.exit(1)
 
 if __name__ == "__main__":
-    train_topic_models()
+    main()
@@ -1,11 +1,16 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', views.index, name='index'),
     path('analyze/', views.analyze, name='analyze'),
+    path('analyze/<int:analysis_id>.json', views.analysis_json, name='analysis_json'),
     path('pricing/', views.pricing, name='pricing'),
     path('register/', views.register, name='register'),
     path('premium-dashboard/', views.premium_dashboard, name='premium_dashboard'),
     path('logout/', views.logout, name='logout'),
+    path('api/v1/analyses/', api.submit_analysis, name='api_submit_analysis'),
+    path('api/v1/analyses/<int:analysis_id>/', api.analysis_detail, name='api_analysis_detail'),
+    path('api/v1/sites/<str:host>/analyses/', api.site_history, name='api_site_history'),
+    path('api/v1/sites/<str:host>/export/', api.site_export, name='api_site_export'),
 ]
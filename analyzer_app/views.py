@@ -1,6 +1,46 @@
+import hashlib
+from functools import lru_cache
+from urllib.parse import urlsplit
+
 from django.shortcuts import render, redirect
-from django.http import HttpResponse
-from .logic import fetch_page, analyze_page
+from django.http import HttpResponse, JsonResponse, Http404
+from django.template.loader import get_template
+from .leaderboard import dashboard_boards, top
+from .logic import load_topic_models
+from .monitor import register_site, site_trends
+from .store import RESULT_CACHE_TIMEOUT, SESSION_KEY, load_analysis, recall_analysis, recall_url, remember_analysis
+from .throttle import RateLimited, analyze_url, check_client_rate
+
+RESULT_TEMPLATE = 'analyzer_app/result.html'
+PREMIUM_CATEGORIES = ('ux', 'engagement', 'topic_fit')
+FREE_RECOMMENDATIONS = 3
+
+@lru_cache(maxsize=None)
+def template_version(template_name: str) -> str:
+    """
+    Short hash of a template's source, so cached fragments are invalidated
+    automatically whenever the template is edited and the server restarts.
+    """
+    source = get_template(template_name).template.source
+    return hashlib.md5(source.encode('utf-8')).hexdigest()[:12]
+
+def result_for_tier(data, is_premium):
+    """
+    Returns the analysis payload as a given tier is allowed to see it:
+    free users get premium categories marked as locked and no AI fixes
+    beyond the first few recommendations, mirroring result.html.
+    """
+    if is_premium:
+        return data
+    categories = {
+        name: ({"score": None, "metrics": [], "locked": True} if name in PREMIUM_CATEGORIES else category)
+        for name, category in data.get('categories', {}).items()
+    }
+    recommendations = [
+        rec if index < FREE_RECOMMENDATIONS else {**{k: v for k, v in rec.items() if k != 'ai_fix'}, "locked": True}
+        for index, rec in enumerate(data.get('recommendations', []))
+    ]
+    return {**data, "categories": categories, "recommendations": recommendations}
 
 def index(request):
     return render(request, 'analyzer_app/index.html')
@@ -19,27 +59,59 @@ def analyze(request):
         return render(request, 'analyzer_app/index.html', {'error': 'Please provide a URL.'})
     
     try:
-        # Check if we have cached analysis results for this URL
-        cached_data_key = f'analysis_data_{url}'
+        # The session only holds analysis ids; payloads live in the result store
+        analysis_id = recall_analysis(request.session, url)
+        analysis_data = load_analysis(analysis_id) if analysis_id else None
         
-        if cached_data_key in request.session:
-            # Use cached analysis results to prevent score changes
-            analysis_data = request.session[cached_data_key]
-        else:
-            # Perform new analysis and cache it
-            html_content = fetch_page(url)
-            analysis_data = analyze_page(html_content, url=url)
-            request.session[cached_data_key] = analysis_data
+        if analysis_data is None:
+            # Perform new analysis and store it so scores don't change on reload;
+            # concurrent requests for the same URL share one analysis
+            check_client_rate(request)
+            analysis_id, analysis_data = analyze_url(url)
+        remember_analysis(request.session, url, analysis_id)
         
         is_premium = request.session.get('is_premium', False)
-        return render(request, 'analyzer_app/result.html', {
+        if is_premium:
+            # Premium pages are re-audited on a schedule to track progress
+            register_site(url, analysis_id=analysis_id)
+        leaderboard = top(limit=3)
+        return render(request, RESULT_TEMPLATE, {
             'data': analysis_data, 
             'url': url,
-            'is_premium': is_premium
+            'is_premium': is_premium,
+            'analysis_id': analysis_id,
+            'template_version': template_version(RESULT_TEMPLATE),
+            'cache_timeout': RESULT_CACHE_TIMEOUT,
+            'leaderboard': leaderboard,
+            # Part of the cached overview's key, so the card follows the board
+            'leaderboard_version': hashlib.md5(repr(leaderboard).encode('utf-8')).hexdigest()[:12],
+            'host': urlsplit(url).netloc.lower(),
         })
+    except RateLimited as e:
+        response = render(request, 'analyzer_app/index.html', {'error': str(e)}, status=429)
+        response['Retry-After'] = str(e.retry_after)
+        return response
     except ValueError as e:
         return render(request, 'analyzer_app/index.html', {'error': str(e)})
 
+def analysis_json(request, analysis_id):
+    """
+    JSON variant of the result page for client-side rendering. Only analyses
+    remembered in the visitor's session are served, trimmed to their tier.
+    """
+    url = recall_url(request.session, analysis_id)
+    analysis_data = load_analysis(analysis_id) if url else None
+    if analysis_data is None:
+        raise Http404("Analysis not found")
+
+    is_premium = request.session.get('is_premium', False)
+    return JsonResponse({
+        'id': analysis_id,
+        'url': url,
+        'is_premium': is_premium,
+        'data': result_for_tier(analysis_data, is_premium),
+    })
+
 def pricing(request):
     return render(request, 'analyzer_app/pricing.html')
 
@@ -51,7 +123,13 @@ def register(request):
     return render(request, 'analyzer_app/register.html')
 
 def premium_dashboard(request):
-    return render(request, 'analyzer_app/premium_dashboard.html')
+    topic = request.GET.get('topic') or None
+    return render(request, 'analyzer_app/premium_dashboard.html', {
+        'topic': topic,
+        'topics': sorted(load_topic_models()),
+        'leaderboards': dashboard_boards(topic=topic),
+        'trends': site_trends(url for url, _ in request.session.get(SESSION_KEY, [])),
+    })
 
 def logout(request):
     # Clear all session data
@@ -0,0 +1,98 @@
+"""
+Benchmark the noun-phrase backends in analyzer_app/phrases.py.
+
+Compares speed against the current TextBlob(text).noun_phrases call and
+measures agreement with its output (set precision / recall / Jaccard).
+
+Usage:
+    python bench_noun_phrases.py https://example.com/post another.html ...
+"""
+import os
+import sys
+import time
+
+from analyzer_app.logic import fetch_page, page_text
+from analyzer_app.nlp_cache import sentence_cache
+from analyzer_app.phrases import BACKENDS, extract_noun_phrases
+
+
+def load_texts(sources):
+    texts = []
+    for source in sources:
+        if os.path.exists(source):
+            with open(source, 'r', encoding='utf-8') as f:
+                html = f.read()
+        else:
+            html = fetch_page(source)
+        texts.append((source, page_text(html)))
+    return texts
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def agreement(candidate, baseline):
+    candidate, baseline = set(candidate), set(baseline)
+    overlap = len(candidate & baseline)
+    precision = overlap / len(candidate) if candidate else 0.0
+    recall = overlap / len(baseline) if baseline else 0.0
+    union = len(candidate | baseline)
+    return precision, recall, (overlap / union if union else 1.0)
+
+
+def run_benchmark(texts):
+    from textblob import TextBlob
+
+    rows = []
+    baselines = []
+    total = 0.0
+    for source, text in texts:
+        phrases, elapsed = timed(lambda: [p.lower() for p in TextBlob(text).noun_phrases])
+        baselines.append(phrases)
+        total += elapsed
+    rows.append(("textblob (current)", total, sum(map(len, baselines)), 1.0, 1.0, 1.0))
+
+    for backend in BACKENDS:
+        for parallel in (False, True):
+            label = f"{backend}{' (pool)' if parallel else ''}"
+            try:
+                extract_noun_phrases(texts[0][1][:200], backend=backend, parallel=False)  # warm up / train
+            except Exception as e:  # missing NLTK corpora raise LookupError or MissingCorpusError
+                print(f"{label}: unavailable ({str(e).strip().splitlines()[0]})")
+                break
+            total, count, scores = 0.0, 0, []
+            for (source, text), baseline in zip(texts, baselines):
+                # Time extraction, not hits left by the warm-up or the previous run
+                sentence_cache.clear()
+                phrases, elapsed = timed(lambda: extract_noun_phrases(text, backend=backend, parallel=parallel))
+                total += elapsed
+                count += len(phrases)
+                scores.append(agreement(phrases, baseline))
+            precision, recall, jaccard = (sum(column) / len(scores) for column in zip(*scores))
+            rows.append((label, total, count, precision, recall, jaccard))
+    return rows
+
+
+def main(argv):
+    if not argv:
+        print(__doc__)
+        sys.exit(1)
+
+    texts = load_texts(argv)
+    print(f"Benchmarking {len(texts)} document(s), {sum(len(t) for s, t in texts)} characters\n")
+    try:
+        rows = run_benchmark(texts)
+    except Exception as e:
+        print(f"Baseline TextBlob noun_phrases failed: {e}")
+        sys.exit(1)
+
+    print(f"{'backend':<22}{'seconds':>10}{'phrases':>10}{'precision':>11}{'recall':>9}{'jaccard':>9}")
+    for label, seconds, count, precision, recall, jaccard in rows:
+        print(f"{label:<22}{seconds:>10.3f}{count:>10}{precision:>11.2f}{recall:>9.2f}{jaccard:>9.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
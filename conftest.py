@@ -0,0 +1,27 @@
+"""
+Lets plain pytest run the Django test cases in analyzer_app/tests (the same
+ones `python manage.py test analyzer_app` runs) against a throwaway database.
+"""
+import os
+
+import django
+import pytest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'website_analyzer.settings')
+django.setup()
+
+# Smoke test against a dev server on :8001; run it directly with `python test_django.py`
+collect_ignore = ['test_django.py']
+
+
+@pytest.fixture(scope='session', autouse=True)
+def django_test_database():
+    from django.test.utils import setup_test_environment, teardown_test_environment
+    from django.test.runner import DiscoverRunner
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+    yield
+    runner.teardown_databases(old_config)
+    teardown_test_environment()
@@ -0,0 +1,322 @@
+"""
+Load test for the analyze flow, fully offline.
+
+Starts a local mock blog (configurable page size and latency) and a Django
+dev server on a throwaway database, then runs N concurrent simulated
+visitors. Each one loads the landing page, submits a post with its CSRF
+token, reloads the result (session recall) and, for a share of them, goes
+through the premium upgrade and dashboard. Reports throughput, latency
+percentiles per step, error rates and the server's memory use.
+
+Usage:
+    python load_test.py --users 20 --iterations 3 --pages 10 --page-words 1500 --latency-ms 200
+    python load_test.py --base-url http://127.0.0.1:8001 --server-pid 1234   # against a running server
+"""
+import argparse
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+NOUNS = (
+    "recipe journey flavor garden coffee market island mountain season kitchen bread guitar "
+    "album concert stadium match novel chapter author museum painting light morning evening"
+).split()
+ADJECTIVES = "simple quick honest local classic fresh warm bright quiet wild golden".split()
+# Sentence shapes full of function words, so mock pages are detected as English
+# and go through every analysis stage
+SENTENCES = [
+    "The {adj} {noun} in the {noun} was {adj} and {adj}",
+    "We took a {adj} {noun} to the {noun} before the {noun} began",
+    "It is not easy to find a {noun} that feels this {adj}",
+    "After the {noun}, our {noun} was {adj} but still very {adj}",
+    "You can bring the {noun} and a {adj} {noun} with you if you want",
+    "There was a {adj} {noun} near the {noun} all {noun}",
+    "Most of us would go back for the {noun} because it was so {adj}",
+    "If you have time, try the {noun} at the {adj} {noun} on your way home",
+]
+PLACEHOLDER_RE = re.compile(r'\{(noun|adj)\}')
+
+# Settings for the spawned server: its own database, and no rate limits unless asked
+SETTINGS_TEMPLATE = """
+from website_analyzer.settings import *
+
+DATABASES = {{'default': {{'ENGINE': 'django.db.backends.sqlite3', 'NAME': {db_path!r}}}}}
+DEBUG = False
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+{limits}
+"""
+NO_LIMITS = "ANALYZER_CLIENT_RATE_LIMIT = 0\nANALYZER_HOST_RATE_LIMIT = 0\n"
+
+
+# --- Mock blog ---
+
+def blog_page(number: int, words: int) -> bytes:
+    rng = random.Random(number)
+    paragraphs = []
+    remaining = words
+    while remaining > 0:
+        size = min(remaining, rng.randint(40, 120))
+        remaining -= size
+        sentences = []
+        while size > 0:
+            sentence = PLACEHOLDER_RE.sub(
+                lambda m: rng.choice(NOUNS if m.group(1) == 'noun' else ADJECTIVES), rng.choice(SENTENCES))
+            sentences.append(sentence[0].upper() + sentence[1:] + ".")
+            size -= len(sentence.split())
+        paragraphs.append("<p>" + " ".join(sentences) + "</p>")
+    images = "".join(f'<img src="/img/{number}-{i}.jpg" alt="Photo {i}">' for i in range(3))
+    return f"""<!DOCTYPE html>
+<html><head>
+<title>Mock post {number}</title>
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<meta name="description" content="Mock blog post number {number} used for offline load testing of the analyzer.">
+<meta name="author" content="Load Tester">
+</head><body>
+<nav><a href="/">Home</a> <a href="/about">About</a></nav>
+<article><h1>Mock post {number}</h1>{images}{''.join(paragraphs)}</article>
+<footer>Subscribe to our newsletter. <a href="https://twitter.com/mock">Twitter</a></footer>
+</body></html>""".encode('utf-8')
+
+
+def start_mock_blog(page_words: int, latency_ms: int) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            match = re.match(r'^/post/(\d+)/?$', self.path)
+            if not match:
+                self.send_error(404)
+                return
+            body = blog_page(int(match.group(1)), page_words)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --- Django server ---
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_django(workdir: str, keep_limits: bool):
+    with open(os.path.join(workdir, 'loadtest_settings.py'), 'w') as f:
+        f.write(SETTINGS_TEMPLATE.format(
+            db_path=os.path.join(workdir, 'loadtest.sqlite3'), limits="" if keep_limits else NO_LIMITS,
+        ))
+    env = {
+        **os.environ,
+        'PYTHONPATH': os.pathsep.join([workdir, BASE_DIR, os.environ.get('PYTHONPATH', '')]),
+        'DJANGO_SETTINGS_MODULE': 'loadtest_settings',
+    }
+    manage = os.path.join(BASE_DIR, 'manage.py')
+    subprocess.run([sys.executable, manage, 'migrate', '--noinput', '-v', '0'], env=env, check=True)
+
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, manage, 'runserver', f'127.0.0.1:{port}', '--noreload'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            requests.get(base_url, timeout=1)
+            return process, base_url
+        except requests.ConnectionError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Django server did not start")
+
+
+def rss_kib(pid: int):
+    """
+    Resident memory of a process in KiB (Linux /proc only).
+    """
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class MemorySampler(threading.Thread):
+    def __init__(self, pid: int, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            value = rss_kib(self.pid)
+            if value is not None:
+                self.samples.append(value)
+            self.stopped.wait(self.interval)
+
+
+# --- Simulated visitors ---
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(int)
+
+    def record(self, step: str, seconds: float, status, ok: bool):
+        with self.lock:
+            self.latencies[step].append(seconds)
+            self.statuses[status] += 1
+            if not ok:
+                self.errors[step] += 1
+
+
+def timed_request(stats: Stats, step: str, session, method: str, url: str, expect: str = None, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = session.request(method, url, timeout=120, **kwargs)
+    except requests.RequestException as e:
+        stats.record(step, time.perf_counter() - start, type(e).__name__, False)
+        return None
+    ok = response.status_code == 200 and (expect is None or expect in response.text)
+    stats.record(step, time.perf_counter() - start, response.status_code, ok)
+    return response
+
+
+def visitor(base_url: str, blog_url: str, pages: int, iterations: int, premium: bool, stats: Stats, seed: int):
+    rng = random.Random(seed)
+    session = requests.Session()
+    for _ in range(iterations):
+        if timed_request(stats, 'landing', session, 'GET', f'{base_url}/') is None:
+            continue
+        csrf_token = session.cookies.get('csrftoken', '')
+        post_url = f'{blog_url}/post/{rng.randrange(pages)}'
+        timed_request(
+            stats, 'analyze', session, 'POST', f'{base_url}/analyze/', expect='Overall Performance',
+            data={'url': post_url, 'csrfmiddlewaretoken': csrf_token}, headers={'Referer': f'{base_url}/'},
+        )
+        # GET /analyze/ re-renders the last URL from the session
+        timed_request(stats, 'reload', session, 'GET', f'{base_url}/analyze/', expect='Overall Performance')
+
+        if premium:
+            timed_request(
+                stats, 'upgrade', session, 'POST', f'{base_url}/register/', expect='Overall Performance',
+                data={'csrfmiddlewaretoken': session.cookies.get('csrftoken', '')},
+                headers={'Referer': f'{base_url}/register/'},
+            )
+            timed_request(stats, 'dashboard', session, 'GET', f'{base_url}/premium-dashboard/', expect='Leaderboards')
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(stats: Stats, elapsed: float, memory):
+    total = sum(len(v) for v in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    print(f"\n{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s, "
+          f"{errors} errors ({100 * errors / total if total else 0:.1f}%)\n")
+    print(f"{'step':<12}{'count':>7}{'errors':>8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for step in ('landing', 'analyze', 'reload', 'upgrade', 'dashboard'):
+        values = stats.latencies.get(step)
+        if not values:
+            continue
+        row = [percentile(values, p) * 1000 for p in (50, 90, 99)] + [max(values) * 1000]
+        print(f"{step:<12}{len(values):>7}{stats.errors[step]:>8}" + "".join(f"{v:>9.0f}" for v in row))
+    print("\nstatus codes: " + ", ".join(f"{k}: {v}" for k, v in sorted(stats.statuses.items(), key=str)))
+    if memory:
+        print(f"server RSS: start {memory[0] / 1024:.0f} MiB, peak {max(memory) / 1024:.0f} MiB, "
+              f"end {memory[-1] / 1024:.0f} MiB")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10, help="Concurrent simulated visitors.")
+    parser.add_argument('--iterations', type=int, default=3, help="Analyses per visitor.")
+    parser.add_argument('--pages', type=int, default=10,
+                        help="Distinct mock posts; fewer pages means more concurrent requests for the same URL.")
+    parser.add_argument('--page-words', type=int, default=1200)
+    parser.add_argument('--latency-ms', type=int, default=100, help="Delay of every mock blog response.")
+    parser.add_argument('--premium-ratio', type=float, default=0.3, help="Share of visitors who upgrade.")
+    parser.add_argument('--base-url', help="Test an already running server instead of starting one.")
+    parser.add_argument('--server-pid', type=int, help="With --base-url: process to sample memory from.")
+    parser.add_argument('--keep-limits', action='store_true', help="Keep the analyzer's rate limits enabled.")
+    parser.add_argument('--seed', type=int, default=1)
+    options = parser.parse_args(argv)
+
+    blog = start_mock_blog(options.page_words, options.latency_ms)
+    blog_url = f'http://127.0.0.1:{blog.server_address[1]}'
+    process = workdir = None
+    if options.base_url:
+        base_url, pid = options.base_url.rstrip('/'), options.server_pid
+    else:
+        workdir = tempfile.mkdtemp(prefix='boosty-loadtest-')
+        process, base_url = start_django(workdir, options.keep_limits)
+        pid = process.pid
+    print(f"Mock blog at {blog_url} ({options.page_words} words, {options.latency_ms} ms); server at {base_url}")
+
+    sampler = MemorySampler(pid) if pid else None
+    if sampler:
+        sampler.start()
+    stats = Stats()
+    rng = random.Random(options.seed)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=options.users) as pool:
+            futures = [
+                pool.submit(visitor, base_url, blog_url, options.pages, options.iterations,
+                            rng.random() < options.premium_ratio, stats, options.seed + i)
+                for i in range(options.users)
+            ]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - start
+    finally:
+        if sampler:
+            sampler.stopped.set()
+            sampler.join()
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+        blog.shutdown()
+
+    report(stats, elapsed, sampler.samples if sampler else [])
+    if workdir:
+        print(f"\nServer database and settings left in {workdir}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
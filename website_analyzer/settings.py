@@ -81,6 +81,29 @@ DATABASES = {
 }
 
 
+# Analyzer
+# Sessions keep only the ids of the most recently analyzed URLs; full
+# results are stored in the Analysis table (see analyzer_app/store.py).
+
+ANALYZER_SESSION_MAX_URLS = 10
+
+# Concurrent requests for the same URL share one analysis, and its result is
+# reused for this many seconds after it finishes (analyzer_app/throttle.py).
+ANALYZER_COALESCE_SECONDS = 30
+
+# Fixed-window rate limits: new analyses per client IP, and fetches per
+# target host, per ANALYZER_RATE_WINDOW seconds. 0 disables a limit.
+ANALYZER_RATE_WINDOW = 60
+ANALYZER_CLIENT_RATE_LIMIT = 10
+ANALYZER_HOST_RATE_LIMIT = 30
+
+# Check every image and link of an analyzed page over the network (broken
+# images, oversized hero images, dead links); results are cached per URL
+# for ANALYZER_RESOURCE_CACHE_SECONDS (analyzer_app/resources.py).
+ANALYZER_RESOURCE_AUDIT = False
+ANALYZER_RESOURCE_CACHE_SECONDS = 60 * 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 